@@ -12,6 +12,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Generator
 from faker import Faker
 import random
+import queue
 from contextlib import contextmanager
 
 # Configure logging
@@ -23,7 +24,33 @@ fake = Faker()
 class PaymentDatabase:
     """SQLite database manager for payment transactions with best practices"""
     
-    def __init__(self, db_path: str = None):
+    # Maximum number of idle connections kept open for reuse
+    POOL_SIZE = 8
+    
+    # Prepared statements kept per connection (sqlite3 default is 128)
+    STATEMENT_CACHE_SIZE = 256
+    
+    # Secondary indexes, applied on every start so existing databases get them too
+    INDEXES = (
+        # One verification per transaction; verify_transaction_credit upserts on it
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_verif_tx_cust ON transaction_verifications(transaction_id, customer_id)",
+        # get_transactions: customer filter, newest first, amount checked from the index
+        "CREATE INDEX IF NOT EXISTS ix_hvt_cust_date_amt ON high_value_transactions(customer_id, transaction_date DESC, amount)",
+        # get_nostro_accounts: a customer's latest EUR settlements
+        "CREATE INDEX IF NOT EXISTS ix_euronostro_cust_date ON euro_nostro_settlements(customer_id, settlement_date DESC)",
+    )
+    
+    # Databases written before ux_verif_tx_cust existed can hold repeated
+    # verifications; keep the first of each before the unique index is built
+    DEDUPE_VERIFICATIONS = """
+        DELETE FROM transaction_verifications
+        WHERE rowid NOT IN (
+            SELECT MIN(rowid) FROM transaction_verifications
+            GROUP BY transaction_id, customer_id
+        )
+    """
+    
+    def __init__(self, db_path: str = None, pool_size: int = POOL_SIZE):
         # Store DB in the same directory as this script by default
         if db_path is None:
             base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -33,17 +60,80 @@ class PaymentDatabase:
         db_dir = os.path.dirname(self.db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
         self.init_database()
+        self.ensure_indexes()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with named column access and tuned PRAGMAs"""
+        # Autocommit mode: reads run without an implicit BEGIN, writes that
+        # need a transaction open one explicitly
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+        conn.execute("PRAGMA mmap_size=268435456")  # Read pages through a 256 MiB memory map
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection from the pool, opening a new one if none is free"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+    
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, or close it if the pool is full"""
+        if conn.in_transaction:
+            conn.rollback()  # Never hand out a connection with uncommitted work
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def close_all(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
         
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        """Context manager for pooled database connections"""
+        conn = self.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            self.release(conn)
+    
+    def ensure_indexes(self):
+        """Create any secondary indexes missing from the database"""
+        with self.get_connection() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                has_unique = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_verif_tx_cust'"
+                ).fetchone()
+                if not has_unique:
+                    removed = conn.execute(self.DEDUPE_VERIFICATIONS).rowcount
+                    if removed:
+                        logger.warning(f"Removed {removed} duplicate transaction verifications before indexing")
+                for statement in self.INDEXES:
+                    conn.execute(statement)
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                # Serve without the missing indexes rather than fail to start
+                conn.execute("ROLLBACK")
+                logger.error(f"Failed to create database indexes: {e}")
     
     def init_database(self):
         """Initialize database and create tables if they don't exist"""
@@ -55,6 +145,7 @@ class PaymentDatabase:
         
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN")
             
             # Customers table
             cursor.execute("""
@@ -250,7 +341,7 @@ class PaymentDatabase:
                 )
             """)
             
-            conn.commit()
+            cursor.execute("COMMIT")
             logger.info("Database tables created successfully")
             
             # Populate with initial data
@@ -262,6 +353,7 @@ class PaymentDatabase:
         
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")  # All mock data lands in one transaction
             
             # Check if data already exists
             cursor.execute("SELECT COUNT(*) FROM customers")
@@ -269,6 +361,9 @@ class PaymentDatabase:
                 logger.info("Data already exists, skipping population")
                 return
             
+            # Every generated date is relative to one clock read
+            now = datetime.now()
+            
             # Create 5 relationship managers
             managers = []
             for i in range(5):
@@ -349,7 +444,7 @@ class PaymentDatabase:
                 for i in range(random.randint(10, 25)):  # 10-25 transactions per customer
                     # Generate transaction date within last 3 months
                     days_ago = random.randint(1, 90)
-                    transaction_date = datetime.now() - timedelta(days=days_ago)
+                    transaction_date = now - timedelta(days=days_ago)
                     
                     transaction = {
                         'transaction_id': f"TXN_{fake.random_int(100000, 999999)}",
@@ -404,7 +499,7 @@ class PaymentDatabase:
             
             for customer in customers:
                 for i in range(random.randint(2, 8)):  # 2-8 settlements per customer
-                    settlement_date = datetime.now() - timedelta(days=random.randint(1, 60))
+                    settlement_date = now - timedelta(days=random.randint(1, 60))
                     
                     settlement = {
                         'settlement_id': f"SETT_{fake.random_int(100000, 999999)}",
@@ -437,12 +532,13 @@ class PaymentDatabase:
             # Create treasury pricing, investment proposals, cash forecasts, and risk limits
             self._create_treasury_data(cursor, customers)
             
-            conn.commit()
+            cursor.execute("COMMIT")
             logger.info("Initial data population completed successfully")
     
     def _create_treasury_data(self, cursor, customers):
         """Create treasury-related data for personalized journey"""
         currency_pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'AUDUSD']
+        now = datetime.now()
         
         for customer in customers:
             # Treasury pricing
@@ -453,7 +549,7 @@ class PaymentDatabase:
                     VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (f"PRICE_{fake.random_int(100000, 999999)}", customer['customer_id'], pair,
                      round(random.uniform(0.5, 2.0), 4), round(random.uniform(0.001, 0.01), 4),
-                     (datetime.now() + timedelta(hours=random.randint(1, 24))).isoformat(),
+                     (now + timedelta(hours=random.randint(1, 24))).isoformat(),
                      random.choice(['Standard', 'Premium', 'VIP'])))
             
             # Investment proposals
@@ -468,12 +564,12 @@ class PaymentDatabase:
                      random.choice(products), round(random.uniform(100000, 5000000), 2),
                      random.choice(['USD', 'EUR', 'GBP']), round(random.uniform(2.5, 8.5), 2),
                      random.choice(['Low', 'Medium', 'High']),
-                     (datetime.now() + timedelta(days=random.randint(30, 365))).isoformat(),
+                     (now + timedelta(days=random.randint(30, 365))).isoformat(),
                      random.choice(['pending', 'approved', 'under_review'])))
             
             # Cash forecasts
             for i in range(random.randint(5, 10)):
-                forecast_date = datetime.now() + timedelta(days=i+1)
+                forecast_date = now + timedelta(days=i+1)
                 opening = round(random.uniform(500000, 10000000), 2)
                 inflows = round(random.uniform(100000, 2000000), 2)
                 outflows = round(random.uniform(50000, 1500000), 2)
@@ -4,14 +4,56 @@ Request/Response logging module for MCP Payment Transaction Server
 Provides audit trail and debugging capabilities
 """
 
+import atexit
+import contextvars
+import functools
 import logging
 import json
+import queue
+import threading
 import time
-from datetime import datetime
 from typing import Any, Dict, Optional
 from database import payment_db
 from customer_manager import customer_manager
 
+try:
+    import orjson  # Optional accelerator for log serialization
+except ImportError:
+    orjson = None
+
+def _dumps(obj: Any) -> str:
+    """Serialize a log payload to JSON text, via orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=str)
+
+# Responses serializing larger than this, or carrying more rows than
+# LOG_PAYLOAD_MAX_ITEMS, are logged as a summary unless the server logger is at
+# DEBUG level
+LOG_PAYLOAD_MAX_BYTES = 4096
+LOG_PAYLOAD_MAX_ITEMS = 25
+
+def _item_count(payload: Any) -> int:
+    """Count the rows a payload carries without serializing it"""
+    if isinstance(payload, dict):
+        return sum(len(value) for value in payload.values() if isinstance(value, (list, tuple, dict)))
+    if isinstance(payload, (list, tuple)):
+        return len(payload)
+    return 0
+
+def _summarize(payload: Any) -> Dict[str, Any]:
+    """Keep a payload's scalar fields and replace its collections with item counts"""
+    summary: Dict[str, Any] = {'truncated': True}
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if isinstance(value, (list, tuple, dict)):
+                summary[key] = f"<{len(value)} items>"
+            else:
+                summary[key] = value
+    elif isinstance(payload, (list, tuple)):
+        summary['items'] = len(payload)
+    return summary
+
 # Configure file logger
 log_formatter = logging.Formatter(
     '%(asctime)s - %(name)s - %(levelname)s - [Customer: %(customer_id)s] - %(message)s'
@@ -38,6 +80,46 @@ console_handler = logging.StreamHandler()
 console_handler.setFormatter(log_formatter)
 server_logger.addHandler(console_handler)
 
+# Serialization and log writes run on a background thread so they stay off the
+# request path; when the queue is full new entries are dropped, not blocked on
+LOG_QUEUE_MAXSIZE = 10_000
+_log_queue: "queue.Queue" = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+_dropped_logs = 0
+
+def _log_worker():
+    """Drain queued log writes until the shutdown sentinel arrives"""
+    while True:
+        item = _log_queue.get()
+        if item is None:
+            return
+        func, args, kwargs = item
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            server_logger.error(f"Background log write failed: {e}", extra={'customer_id': 'unknown'})
+
+def _enqueue(func, *args, **kwargs):
+    """Hand a log write to the background worker, dropping it if the queue is full"""
+    global _dropped_logs
+    try:
+        _log_queue.put_nowait((func, args, kwargs))
+    except queue.Full:
+        _dropped_logs += 1
+
+def _flush_logs(timeout: float = 5.0):
+    """Stop the worker after it has written everything already queued"""
+    try:
+        _log_queue.put(None, timeout=timeout)
+    except queue.Full:
+        pass
+    _log_thread.join(timeout)
+    if _dropped_logs:
+        server_logger.warning(f"Dropped {_dropped_logs} log entries (queue full)", extra={'customer_id': 'unknown'})
+
+_log_thread = threading.Thread(target=_log_worker, name="request-log-writer", daemon=True)
+_log_thread.start()
+atexit.register(_flush_logs)
+
 class RequestLogger:
     """Handles request/response logging with database persistence"""
     
@@ -49,29 +131,47 @@ class RequestLogger:
         execution_time_ms: int,
         customer_id: Optional[str] = None
     ):
-        """Log request and response to both file and database"""
+        """Log request and response to both file and database (written in the background)"""
         
+        # Resolve the customer now; the context may switch before the write runs
         if not customer_id:
             current_customer = customer_manager.get_current_customer()
             customer_id = current_customer['customer_id'] if current_customer else 'unknown'
         
-        # Create log entry
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'customer_id': customer_id,
-            'request_type': request_type,
-            'request_data': request_data,
-            'response_data': response_data,
-            'execution_time_ms': execution_time_ms
-        }
+        _enqueue(
+            RequestLogger._write_request_response,
+            request_type, request_data, response_data, execution_time_ms, customer_id
+        )
+    
+    @staticmethod
+    def _write_request_response(
+        request_type: str,
+        request_data: Dict[str, Any],
+        response_data: Dict[str, Any],
+        execution_time_ms: int,
+        customer_id: str
+    ):
+        """Serialize a request/response pair and write it to the log file and database"""
+        
+        # Serialize once for both sinks
+        request_json = _dumps(request_data)
+        if server_logger.isEnabledFor(logging.DEBUG):
+            response_json = _dumps(response_data)
+        elif _item_count(response_data) > LOG_PAYLOAD_MAX_ITEMS:
+            # Row count alone rules the payload out, so skip encoding it
+            response_json = _dumps(_summarize(response_data))
+        else:
+            response_json = _dumps(response_data)
+            if len(response_json) > LOG_PAYLOAD_MAX_BYTES:
+                response_json = _dumps(_summarize(response_data))
         
         # Log to file with customer context
         extra = {'customer_id': customer_id}
         server_logger.info(
             f"REQUEST: {request_type} | "
             f"EXECUTION_TIME: {execution_time_ms}ms | "
-            f"REQUEST: {json.dumps(request_data, default=str)} | "
-            f"RESPONSE: {json.dumps(response_data, default=str)}",
+            f"REQUEST: {request_json} | "
+            f"RESPONSE: {response_json}",
             extra=extra
         )
         
@@ -86,11 +186,10 @@ class RequestLogger:
                 """, (
                     customer_id,
                     request_type,
-                    json.dumps(request_data, default=str),
-                    json.dumps(response_data, default=str),
+                    request_json,
+                    response_json,
                     execution_time_ms
                 ))
-                conn.commit()
                 
         except Exception as e:
             server_logger.error(f"Failed to log to database: {e}", extra=extra)
@@ -111,7 +210,7 @@ class RequestLogger:
         extra = {'customer_id': customer_id}
         server_logger.error(
             f"ERROR in {request_type}: {error_message} | "
-            f"REQUEST: {json.dumps(request_data or {}, default=str)}",
+            f"REQUEST: {_dumps(request_data or {})}",
             extra=extra
         )
     
@@ -124,13 +223,24 @@ class RequestLogger:
             extra=extra
         )
 
+# perf_counter_ns() at entry to the innermost @log_execution_time call
+_call_start_ns: "contextvars.ContextVar[int]" = contextvars.ContextVar("call_start_ns")
+
+def elapsed_ms() -> int:
+    """Milliseconds since the current @log_execution_time call started (0 outside one)"""
+    start_ns = _call_start_ns.get(None)
+    if start_ns is None:
+        return 0
+    return (time.perf_counter_ns() - start_ns) // 1_000_000
+
 def log_execution_time(func):
     """Decorator to automatically log execution time"""
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        token = _call_start_ns.set(time.perf_counter_ns())
         try:
             result = func(*args, **kwargs)
-            execution_time = int((time.time() - start_time) * 1000)
+            execution_time = elapsed_ms()
             
             # Extract function name and basic info
             func_name = func.__name__
@@ -138,7 +248,8 @@ def log_execution_time(func):
             customer_id = current_customer['customer_id'] if current_customer else 'unknown'
             
             extra = {'customer_id': customer_id}
-            server_logger.info(
+            _enqueue(
+                server_logger.info,
                 f"EXECUTION: {func_name} completed in {execution_time}ms",
                 extra=extra
             )
@@ -146,12 +257,15 @@ def log_execution_time(func):
             return result
             
         except Exception as e:
-            execution_time = int((time.time() - start_time) * 1000)
+            execution_time = elapsed_ms()
             current_customer = customer_manager.get_current_customer()
             customer_id = current_customer['customer_id'] if current_customer else 'unknown'
             
             RequestLogger.log_error(func.__name__, str(e), customer_id=customer_id)
             raise
+        
+        finally:
+            _call_start_ns.reset(token)
             
     return wrapper
 
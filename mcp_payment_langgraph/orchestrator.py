@@ -1,38 +1,275 @@
-from typing import Any, Dict, List, Optional, Sequence, TypedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from payment_service import payment_service
 from customer_manager import customer_manager
 from logger import request_logger
 import json
+import re
 from collections import defaultdict, deque
 from langgraph.graph import StateGraph, END
 
-class PaymentGraphState(TypedDict):
+try:
+    import ahocorasick  # Optional accelerator (pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
+# Keywords that trigger each action
+_TXN_KW = frozenset({"transaction", "payment", "high value", "last 5"})
+_DISPUTE_KW = frozenset({"dispute", "raise dispute", "failed", "pending"})
+_RM_KW = frozenset({"relationship manager", "manager", "rm"})
+_VERIFY_KW = frozenset({"verify", "credited", "credit", "check transaction"})
+_NOSTRO_KW = frozenset({"nostro", "euro nostro", "export settlement", "euro account", "euro credit"})
+_NOSTRO_LIST_KW = frozenset({"nostro accounts", "correspondent accounts", "nostro list"})
+
+# Action -> keywords, in routing order
+ACTION_KEYWORDS = {
+    "get_transactions": _TXN_KW,
+    "raise_dispute": _DISPUTE_KW,
+    "get_rm": _RM_KW,
+    "verify_transaction": _VERIFY_KW,
+    "check_nostro": _NOSTRO_KW,
+    "get_nostro_accounts": _NOSTRO_LIST_KW,
+}
+
+# Currency words recognised in user input, in priority order
+CURRENCY_KEYWORDS = {
+    "EUR": frozenset({"eur", "euro"}),
+    "USD": frozenset({"usd", "dollar"}),
+    "GBP": frozenset({"gbp", "pound"}),
+    "JPY": frozenset({"jpy", "yen"}),
+    "CHF": frozenset({"chf", "franc"}),
+}
+
+class Ok(NamedTuple):
+    """Successful service call result"""
+    data: Dict[str, Any]
+
+class Err(NamedTuple):
+    """Failed service call result"""
+    message: str
+
+Result = Union[Ok, Err]
+
+@dataclass(slots=True)
+class PaymentGraphState:
     """State for the payment processing graph"""
     messages: Sequence[BaseMessage]
     user_input: str
-    action_needed: List[str]  # List of actions: ['get_transactions', 'raise_dispute', 'get_rm', 'verify_transaction', 'check_nostro', 'get_nostro_accounts']
-    transactions: Optional[List[Dict[str, Any]]]
-    relationship_manager: Optional[Dict[str, Any]]
-    dispute_details: Optional[Dict[str, Any]]
-    verification_result: Optional[Dict[str, Any]]
-    nostro_credit_result: Optional[Dict[str, Any]]
-    nostro_accounts: Optional[Dict[str, Any]]
-    final_response: str
+    action_needed: List[str] = field(default_factory=list)  # List of actions: ['get_transactions', 'raise_dispute', 'get_rm', 'verify_transaction', 'check_nostro', 'get_nostro_accounts']
+    transactions: Optional[List[Dict[str, Any]]] = None
+    relationship_manager: Optional[Dict[str, Any]] = None
+    dispute_details: Optional[Result] = None
+    verification_result: Optional[Result] = None
+    nostro_credit_result: Optional[Result] = None
+    nostro_accounts: Optional[Result] = None
+    currency_hint: Optional[str] = None  # Currency mentioned in user input, if any
+    input_tokens: List[str] = field(default_factory=list)  # Whitespace tokens of user_input, split once
+    final_response: str = ""
+
+NO_ACTIONS_MESSAGE = "No actions were performed. Please specify what you'd like to do."
+
+def _format_transactions(txns: Optional[List[Dict[str, Any]]]) -> str:
+    """Format the high value transactions section"""
+    if not txns:
+        return ""
+    response_parts = ["**High Value Transactions (Last 5):**"]
+    for i, txn in enumerate(txns, 1):
+        response_parts.append(
+            f"{i}. Transaction ID: {txn['transaction_id']}\n"
+            f"   Amount: {txn['currency']} {txn['amount']:,.2f}\n"
+            f"   Status: {txn['status']}\n"
+            f"   Date: {txn['transaction_date']}\n"
+            f"   Recipient: {txn['recipient_name']}\n"
+        )
+    return "\n\n".join(response_parts)
+
+def _format_relationship_manager(rm: Optional[Dict[str, Any]]) -> str:
+    """Format the relationship manager section"""
+    if not rm:
+        return ""
+    return (
+        f"**Relationship Manager Details:**\n"
+        f"Name: {rm['name']}\n"
+        f"Email: {rm['email']}\n"
+        f"Phone: {rm['phone']}\n"
+        f"Branch: {rm['department']}\n"
+        f"Specialization: {', '.join(rm['specialization']) if isinstance(rm['specialization'], list) else rm['specialization']}\n"
+        f"Experience: {rm['experience_years']} years"
+    )
+
+def _format_dispute(dispute: Optional[Result]) -> str:
+    """Format the dispute section"""
+    if not dispute:
+        return ""
+    if type(dispute) is Err:
+        return f"**Dispute Error:** {dispute.message}"
+    dispute = dispute.data
+    return (
+        f"**Dispute Raised Successfully:**\n"
+        f"Dispute ID: {dispute.get('dispute_id','')}\n"
+        f"Transaction ID: {dispute.get('transaction_id','')}\n"
+        f"Status: {dispute.get('status','')}\n"
+        f"Assigned Manager: {dispute.get('assigned_manager',{}).get('name','N/A')}\n"
+        f"Manager Contact: {dispute.get('assigned_manager',{}).get('email','N/A')}"
+    )
+
+def _format_verification(verification: Optional[Result]) -> str:
+    """Format the transaction verification section"""
+    if not verification:
+        return ""
+    if type(verification) is Err:
+        return f"**Verification Error:** {verification.message}"
+    verification = verification.data
+    response_parts = [
+        f"**Transaction Verification:**\n"
+        f"Transaction ID: {verification.get('transaction_id','')}\n"
+        f"Is Credited: {'Yes' if verification.get('is_credited') else 'No'}\n"
+        f"Status: {verification.get('verification_status','')}\n"
+        f"Notes: {verification.get('notes','')}"
+    ]
+    if verification.get("credited_amount"):
+        response_parts.append(f"Credited Amount: USD {verification['credited_amount']:,.2f}")
+    if verification.get("credited_date"):
+        response_parts.append(f"Credited Date: {verification['credited_date']}")
+    return "\n\n".join(response_parts)
+
+def _fmt_settlement(i: int, settlement: Dict[str, Any]) -> str:
+    """Format one export settlement, including its credited date if any"""
+    status_indicator = "✅" if settlement.get("is_credited") else "⏳"
+    amount = format(settlement.get('amount', 0), ',.2f')
+    text = (
+        f"{i}. {status_indicator} Settlement ID: {settlement.get('settlement_id', '')}\n"
+        f"   Export Reference: {settlement.get('export_reference', '')}\n"
+        f"   Amount: {settlement.get('currency', 'EUR')} {amount}\n"
+        f"   Counterparty: {settlement.get('counterparty', '')}\n"
+        f"   Status: {settlement.get('status', '')}\n"
+        f"   Settlement Date: {settlement.get('settlement_date', '')[:10] if settlement.get('settlement_date') else ''}"
+    )
+    if settlement.get("actual_credit_date"):
+        text += f"\n\n   Credited Date: {settlement['actual_credit_date'][:10]}"
+    return text
+
+def _fmt_nostro_account(i: int, acc: Dict[str, Any]) -> str:
+    """Format one nostro account line item"""
+    return (
+        f"{i}. Account ID: {acc.get('account_id', '')}\n"
+        f"   Currency: {acc.get('currency', '')}\n"
+        f"   Type: {acc.get('account_type', '')}\n"
+        f"   Correspondent: {acc.get('correspondent_bank', '')}\n"
+        f"   SWIFT: {acc.get('correspondent_swift', '')}\n"
+        f"   Balance: {acc.get('currency', '')} {acc.get('balance', 0):,.2f}\n"
+        f"   Status: {acc.get('account_status', '')}"
+    )
+
+def _format_nostro_credit(nostro_credit: Optional[Result]) -> str:
+    """Format the Euro nostro credit check section"""
+    if not nostro_credit:
+        return ""
+    if type(nostro_credit) is Err:
+        return f"**Euro Nostro Error:** {nostro_credit.message}"
+    nostro_credit = nostro_credit.data
+
+    response_parts = [
+        f"**Euro Nostro Account Credit Status:**",
+        f"Status: {nostro_credit.get('status', 'unknown')}",
+        f"Message: {nostro_credit.get('message', '')}",
+    ]
+
+    if nostro_credit.get("nostro_account"):
+        acc = nostro_credit["nostro_account"]
+        cur = acc.get('currency', 'EUR')
+        current_balance = format(acc.get('current_balance', 0), ',.2f')
+        available_balance = format(acc.get('available_balance', 0), ',.2f')
+        response_parts.append(
+            f"**Account Details:**\n"
+            f"Account ID: {acc.get('account_id', '')}\n"
+            f"Currency: {acc.get('currency', '')}\n"
+            f"Correspondent Bank: {acc.get('correspondent_bank', '')}\n"
+            f"SWIFT: {acc.get('correspondent_swift', '')}\n"
+            f"Current Balance: {cur} {current_balance}\n"
+            f"Available Balance: {cur} {available_balance}"
+        )
+
+    if nostro_credit.get("settlements"):
+        response_parts.append(
+            "**Export Settlements:**\n\n"
+            + "\n\n".join(_fmt_settlement(i, settlement) for i, settlement in enumerate(nostro_credit["settlements"], 1))
+        )
+
+    if nostro_credit.get("summary"):
+        summary = nostro_credit["summary"]
+        response_parts.append(
+            f"**Summary:**\n"
+            f"Total Settlements: {summary.get('total_settlements', 0)}\n"
+            f"Credited: {summary.get('credited_count', 0)} (EUR {summary.get('total_credited_amount', 0):,.2f})\n"
+            f"Pending: {summary.get('pending_count', 0)} (EUR {summary.get('total_pending_amount', 0):,.2f})"
+        )
+    return "\n\n".join(response_parts)
+
+def _format_nostro_accounts(nostro_accounts: Optional[Result]) -> str:
+    """Format the nostro accounts section"""
+    if not nostro_accounts:
+        return ""
+    if type(nostro_accounts) is Err:
+        return f"**Nostro Accounts Error:** {nostro_accounts.message}"
+    nostro_accounts = nostro_accounts.data
+
+    response_parts = [
+        f"**Nostro Accounts ({nostro_accounts.get('currency_filter', 'all')} filter):**",
+        f"Total Count: {nostro_accounts.get('total_count', 0)}",
+    ]
+    accounts = nostro_accounts.get("accounts", [])
+    if accounts:
+        response_parts.append("\n\n".join(_fmt_nostro_account(i, acc) for i, acc in enumerate(accounts, 1)))
+    return "\n\n".join(response_parts)
+
+# State field -> section formatter, in response order
+FORMATTERS = {
+    "transactions": _format_transactions,
+    "relationship_manager": _format_relationship_manager,
+    "dispute_details": _format_dispute,
+    "verification_result": _format_verification,
+    "nostro_credit_result": _format_nostro_credit,
+    "nostro_accounts": _format_nostro_accounts,
+}
+
+# Graph node -> state field it produces
+NODE_OUTPUTS = {
+    "get_transactions": "transactions",
+    "get_relationship_manager": "relationship_manager",
+    "raise_dispute": "dispute_details",
+    "verify_transaction": "verification_result",
+    "check_nostro_credit": "nostro_credit_result",
+    "get_nostro_accounts": "nostro_accounts",
+}
 
 class PaymentOrchestrator:
     """LangGraph orchestrator for payment operations"""
     
     def __init__(self):
         self.service = payment_service
+        self._keyword_matcher = self._build_keyword_matcher()
+        # Word following "export"/"settlement"/"reference" is a candidate export reference
+        self._export_ref_re = re.compile(r"\b(?:export|settlement|reference)\s+(\w+)", re.I)
         self.graph = self._build_graph()
         self.compiled_graph = self.graph.compile()
+        self._streaming_graph = None
         # Memory: user_id -> deque of last 5 transactions
         self.user_transaction_memory = defaultdict(lambda: deque(maxlen=5))
     
-    def _build_graph(self):
+    @property
+    def streaming_graph(self):
+        """Streaming variant of the graph, compiled on first use"""
+        # Sections are formatted per node, so it has no format_response node
+        if self._streaming_graph is None:
+            self._streaming_graph = self._build_graph(streaming=True).compile()
+        return self._streaming_graph
+    
+    def _build_graph(self, streaming: bool = False):
         """Build the LangGraph workflow"""
         workflow = StateGraph(PaymentGraphState)
+        finish = END if streaming else "format_response"
         
         # Add nodes
         workflow.add_node("analyze_request", self._analyze_request)
@@ -42,7 +279,8 @@ class PaymentOrchestrator:
         workflow.add_node("verify_transaction", self._verify_transaction)
         workflow.add_node("check_nostro_credit", self._check_nostro_credit)
         workflow.add_node("get_nostro_accounts", self._get_nostro_accounts)
-        workflow.add_node("format_response", self._format_response)
+        if not streaming:
+            workflow.add_node("format_response", self._format_response)
         
         # Set entry point
         workflow.set_entry_point("analyze_request")
@@ -57,7 +295,7 @@ class PaymentOrchestrator:
                 "verify_transaction": "verify_transaction",
                 "check_nostro_credit": "check_nostro_credit",
                 "get_nostro_accounts": "get_nostro_accounts",
-                "format_response": "format_response"
+                "format_response": finish
             }
         )
         
@@ -67,7 +305,7 @@ class PaymentOrchestrator:
             self._check_next_action,
             {
                 "raise_dispute": "get_relationship_manager",
-                "format_response": "format_response"
+                "format_response": finish
             }
         )
         
@@ -77,53 +315,77 @@ class PaymentOrchestrator:
             self._check_dispute_needed,
             {
                 "raise_dispute": "raise_dispute",
-                "format_response": "format_response"
+                "format_response": finish
             }
         )
         
         # Dispute and verification flow
-        workflow.add_edge("raise_dispute", "format_response")
-        workflow.add_edge("verify_transaction", "format_response")
-        workflow.add_edge("check_nostro_credit", "format_response")
-        workflow.add_edge("get_nostro_accounts", "format_response")
-        workflow.add_edge("format_response", END)
+        workflow.add_edge("raise_dispute", finish)
+        workflow.add_edge("verify_transaction", finish)
+        workflow.add_edge("check_nostro_credit", finish)
+        workflow.add_edge("get_nostro_accounts", finish)
+        if not streaming:
+            workflow.add_edge("format_response", END)
         return workflow
     
+    def _build_keyword_matcher(self):
+        """Build a single-pass matcher over all action and currency keywords"""
+        tagged = [(keyword, ("action", action)) for action, keywords in ACTION_KEYWORDS.items() for keyword in keywords]
+        tagged += [(keyword, ("currency", code)) for code, keywords in CURRENCY_KEYWORDS.items() for keyword in keywords]
+        
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword, tag in tagged:
+                automaton.add_word(keyword, tag)
+            automaton.make_automaton()
+            return automaton
+        
+        # Fallback: per action/currency, a set of single-word keywords for a
+        # token intersection fast path plus a compiled alternation of all keywords
+        patterns = defaultdict(list)
+        for keyword, tag in tagged:
+            patterns[tag].append(keyword)
+        return [
+            (
+                tag,
+                frozenset(keyword for keyword in keywords if " " not in keyword),
+                re.compile("|".join(re.escape(keyword) for keyword in sorted(keywords)))
+            )
+            for tag, keywords in patterns.items()
+        ]
+    
+    def _match_keywords(self, text: str) -> Set[Tuple[str, str]]:
+        """Return the (kind, value) tags of every keyword found in text"""
+        if ahocorasick is not None:
+            return {tag for _, tag in self._keyword_matcher.iter(text)}
+        tokens = set(text.split())
+        return {
+            tag for tag, words, pattern in self._keyword_matcher
+            if not words.isdisjoint(tokens) or pattern.search(text)
+        }
+    
     def _analyze_request(self, state: PaymentGraphState) -> PaymentGraphState:
         """Analyze user request to determine required actions"""
-        user_input = state["user_input"].lower()
-        actions = []
+        user_input = state.user_input.lower()
+        state.input_tokens = state.user_input.split()
+        matches = self._match_keywords(user_input)
         
         # Determine what actions are needed based on user input
-        if any(keyword in user_input for keyword in ["transaction", "payment", "high value", "last 5"]):
-            actions.append("get_transactions")
-        
-        if any(keyword in user_input for keyword in ["dispute", "raise dispute", "failed", "pending"]):
-            actions.append("raise_dispute")
-        
-        if any(keyword in user_input for keyword in ["relationship manager", "manager", "rm"]):
-            actions.append("get_rm")
-        
-        if any(keyword in user_input for keyword in ["verify", "credited", "credit", "check transaction"]):
-            actions.append("verify_transaction")
-        
-        # Euro Nostro account queries
-        if any(keyword in user_input for keyword in ["nostro", "euro nostro", "export settlement", "euro account", "euro credit"]):
-            actions.append("check_nostro")
-        
-        if any(keyword in user_input for keyword in ["nostro accounts", "correspondent accounts", "nostro list"]):
-            actions.append("get_nostro_accounts")
+        actions = [action for action in ACTION_KEYWORDS if ("action", action) in matches]
         
         # If dispute is needed, we also need RM
         if "raise_dispute" in actions and "get_rm" not in actions:
             actions.append("get_rm")
         
-        state["action_needed"] = actions
+        state.action_needed = actions
+        state.currency_hint = next(
+            (code for code in CURRENCY_KEYWORDS if ("currency", code) in matches), None
+        )
         return state
     
     def _route_actions(self, state: PaymentGraphState) -> str:
         """Route to the first action needed"""
-        actions = state["action_needed"]
+        actions = state.action_needed
         
         if "check_nostro" in actions:
             return "check_nostro_credit"
@@ -140,19 +402,18 @@ class PaymentOrchestrator:
     
     def _check_next_action(self, state: PaymentGraphState) -> str:
         """Check what to do after getting transactions"""
-        if "raise_dispute" in state["action_needed"]:
+        if "raise_dispute" in state.action_needed:
             return "raise_dispute"
         return "format_response"
     
     def _check_dispute_needed(self, state: PaymentGraphState) -> str:
         """Check if dispute needs to be raised after getting RM"""
-        if "raise_dispute" in state["action_needed"]:
+        if "raise_dispute" in state.action_needed:
             return "raise_dispute"
         return "format_response"
     
     def _get_user_id(self, state: PaymentGraphState) -> str:
-        user_input = state.get("user_input", "")
-        for word in user_input.split():
+        for word in state.input_tokens:
             if word.startswith("ACC") or word.startswith("account_"):
                 return word
         return "default_user"
@@ -161,13 +422,13 @@ class PaymentOrchestrator:
         """Get high value transactions and update memory"""
         try:
             transactions = self.service.get_transactions(5)
-            state["transactions"] = transactions
+            state.transactions = transactions
             # --- Memory: store for user ---
             user_id = self._get_user_id(state)
             for txn in transactions:
                 self.user_transaction_memory[user_id].appendleft(txn)
         except Exception as e:
-            state["transactions"] = []
+            state.transactions = []
             print(f"Error getting transactions: {e}")
         return state
     
@@ -179,9 +440,9 @@ class PaymentOrchestrator:
         """Get relationship manager details"""
         try:
             rm = self.service.get_relationship_manager_details()
-            state["relationship_manager"] = rm
+            state.relationship_manager = rm
         except Exception as e:
-            state["relationship_manager"] = None
+            state.relationship_manager = None
             print(f"Error getting relationship manager: {e}")
         
         return state
@@ -189,7 +450,7 @@ class PaymentOrchestrator:
     def _raise_dispute(self, state: PaymentGraphState) -> PaymentGraphState:
         """Raise dispute for a transaction"""
         try:
-            transactions = state.get("transactions", [])
+            transactions = state.transactions
             if transactions:
                 # Find a failed or pending transaction to dispute
                 disputable_txn = None
@@ -203,14 +464,14 @@ class PaymentOrchestrator:
                         disputable_txn["transaction_id"],
                         "Transaction failed to process within expected timeframe"
                     )
-                    state["dispute_details"] = dispute
+                    state.dispute_details = Ok(dispute)
                 else:
-                    state["dispute_details"] = {"error": "No disputable transactions found"}
+                    state.dispute_details = Err("No disputable transactions found")
             else:
-                state["dispute_details"] = {"error": "No transactions available to dispute"}
+                state.dispute_details = Err("No transactions available to dispute")
                 
         except Exception as e:
-            state["dispute_details"] = {"error": f"Error raising dispute: {e}"}
+            state.dispute_details = Err(f"Error raising dispute: {e}")
         
         return state
     
@@ -218,7 +479,7 @@ class PaymentOrchestrator:
         """Verify transaction credit status"""
         try:
             # For demo purposes, use a transaction from the list or create a sample ID
-            transactions = state.get("transactions", [])
+            transactions = state.transactions
             transaction_id = None
             
             if transactions:
@@ -231,12 +492,12 @@ class PaymentOrchestrator:
             
             if transaction_id:
                 verification = self.service.verify_transaction_credit(transaction_id)
-                state["verification_result"] = verification
+                state.verification_result = Ok(verification)
             else:
-                state["verification_result"] = {"error": "No transaction ID available for verification"}
+                state.verification_result = Err("No transaction ID available for verification")
                 
         except Exception as e:
-            state["verification_result"] = {"error": f"Error verifying transaction: {e}"}
+            state.verification_result = Err(f"Error verifying transaction: {e}")
         
         return state
     
@@ -244,205 +505,80 @@ class PaymentOrchestrator:
         """Check Euro nostro account credit for export settlement"""
         try:
             # Extract export reference if mentioned in user input
-            user_input = state.get("user_input", "").lower()
-            export_reference = None
-            
-            # Look for export reference patterns
-            words = user_input.split()
-            for i, word in enumerate(words):
-                if word in ["export", "settlement", "reference"] and i + 1 < len(words):
-                    next_word = words[i + 1]
-                    if next_word.upper().startswith("EXP") or len(next_word) > 8:
-                        export_reference = next_word
-                        break
+            export_reference = next(
+                (
+                    match.group(1) for match in self._export_ref_re.finditer(state.user_input)
+                    if match.group(1).upper().startswith("EXP") or len(match.group(1)) > 8
+                ),
+                None
+            )
             
             nostro_result = self.service.get_nostro_accounts('EUR', export_reference)
-            state["nostro_credit_result"] = nostro_result
+            state.nostro_credit_result = Ok(nostro_result)
             
         except Exception as e:
-            state["nostro_credit_result"] = {"error": f"Error checking Euro nostro credit: {e}"}
+            state.nostro_credit_result = Err(f"Error checking Euro nostro credit: {e}")
         
         return state
     
     def _get_nostro_accounts(self, state: PaymentGraphState) -> PaymentGraphState:
         """Get nostro accounts, optionally filtered by currency"""
         try:
-            # Extract currency if mentioned in user input
-            user_input = state.get("user_input", "").lower()
-            currency = None
-            
-            # Check for currency mentions
-            currencies = ["eur", "euro", "usd", "dollar", "gbp", "pound", "jpy", "yen", "chf", "franc"]
-            for curr in currencies:
-                if curr in user_input:
-                    if curr in ["eur", "euro"]:
-                        currency = "EUR"
-                    elif curr in ["usd", "dollar"]:
-                        currency = "USD"
-                    elif curr in ["gbp", "pound"]:
-                        currency = "GBP"
-                    elif curr in ["jpy", "yen"]:
-                        currency = "JPY"
-                    elif curr in ["chf", "franc"]:
-                        currency = "CHF"
-                    break
+            # Currency mentioned in user input, resolved by _analyze_request
+            currency = state.currency_hint
             
             nostro_accounts = self.service.get_nostro_accounts(currency)
-            state["nostro_accounts"] = nostro_accounts
+            state.nostro_accounts = Ok(nostro_accounts)
             
         except Exception as e:
-            state["nostro_accounts"] = {"error": f"Error getting nostro accounts: {e}"}
+            state.nostro_accounts = Err(f"Error getting nostro accounts: {e}")
         
         return state
 
     def _format_response(self, state: PaymentGraphState) -> PaymentGraphState:
         """Format the final response"""
         response_parts = []
-        txns = state.get("transactions") or []
-        if txns:
-            response_parts.append("**High Value Transactions (Last 5):**")
-            for i, txn in enumerate(txns, 1):
-                response_parts.append(
-                    f"{i}. Transaction ID: {txn['transaction_id']}\n"
-                    f"   Amount: {txn['currency']} {txn['amount']:,.2f}\n"
-                    f"   Status: {txn['status']}\n"
-                    f"   Date: {txn['transaction_date']}\n"
-                    f"   Recipient: {txn['recipient_name']}\n"
-                )
-        
-        rm = state.get("relationship_manager")
-        if rm:
-            response_parts.append(
-                f"**Relationship Manager Details:**\n"
-                f"Name: {rm['name']}\n"
-                f"Email: {rm['email']}\n"
-                f"Phone: {rm['phone']}\n"
-                f"Branch: {rm['department']}\n"
-                f"Specialization: {', '.join(rm['specialization']) if isinstance(rm['specialization'], list) else rm['specialization']}\n"
-                f"Experience: {rm['experience_years']} years"
-            )
-        
-        dispute = state.get("dispute_details")
-        if dispute:
-            if isinstance(dispute, dict) and "error" in dispute:
-                response_parts.append(f"**Dispute Error:** {dispute['error']}")
-            else:
-                response_parts.append(
-                    f"**Dispute Raised Successfully:**\n"
-                    f"Dispute ID: {dispute.get('dispute_id','')}\n"
-                    f"Transaction ID: {dispute.get('transaction_id','')}\n"
-                    f"Status: {dispute.get('status','')}\n"
-                    f"Assigned Manager: {dispute.get('assigned_manager',{}).get('name','N/A')}\n"
-                    f"Manager Contact: {dispute.get('assigned_manager',{}).get('email','N/A')}"
-                )
-        
-        verification = state.get("verification_result")
-        if verification:
-            if isinstance(verification, dict) and "error" in verification:
-                response_parts.append(f"**Verification Error:** {verification['error']}")
-            else:
-                response_parts.append(
-                    f"**Transaction Verification:**\n"
-                    f"Transaction ID: {verification.get('transaction_id','')}\n"
-                    f"Is Credited: {'Yes' if verification.get('is_credited') else 'No'}\n"
-                    f"Status: {verification.get('verification_status','')}\n"
-                    f"Notes: {verification.get('notes','')}"
-                )
-                if verification.get("credited_amount"):
-                    response_parts.append(f"Credited Amount: USD {verification['credited_amount']:,.2f}")
-                if verification.get("credited_date"):
-                    response_parts.append(f"Credited Date: {verification['credited_date']}")
-        
-        # Euro Nostro credit check results
-        nostro_credit = state.get("nostro_credit_result")
-        if nostro_credit:
-            if isinstance(nostro_credit, dict) and "error" in nostro_credit:
-                response_parts.append(f"**Euro Nostro Error:** {nostro_credit['error']}")
-            else:
-                response_parts.append(f"**Euro Nostro Account Credit Status:**")
-                response_parts.append(f"Status: {nostro_credit.get('status', 'unknown')}")
-                response_parts.append(f"Message: {nostro_credit.get('message', '')}")
-                
-                if nostro_credit.get("nostro_account"):
-                    acc = nostro_credit["nostro_account"]
-                    response_parts.append(
-                        f"**Account Details:**\n"
-                        f"Account ID: {acc.get('account_id', '')}\n"
-                        f"Currency: {acc.get('currency', '')}\n"
-                        f"Correspondent Bank: {acc.get('correspondent_bank', '')}\n"
-                        f"SWIFT: {acc.get('correspondent_swift', '')}\n"
-                        f"Current Balance: {acc.get('currency', 'EUR')} {acc.get('current_balance', 0):,.2f}\n"
-                        f"Available Balance: {acc.get('currency', 'EUR')} {acc.get('available_balance', 0):,.2f}"
-                    )
-                
-                if nostro_credit.get("settlements"):
-                    response_parts.append("**Export Settlements:**")
-                    for i, settlement in enumerate(nostro_credit["settlements"], 1):
-                        status_indicator = "✅" if settlement.get("is_credited") else "⏳"
-                        response_parts.append(
-                            f"{i}. {status_indicator} Settlement ID: {settlement.get('settlement_id', '')}\n"
-                            f"   Export Reference: {settlement.get('export_reference', '')}\n"
-                            f"   Amount: {settlement.get('currency', 'EUR')} {settlement.get('amount', 0):,.2f}\n"
-                            f"   Counterparty: {settlement.get('counterparty', '')}\n"
-                            f"   Status: {settlement.get('status', '')}\n"
-                            f"   Settlement Date: {settlement.get('settlement_date', '')[:10] if settlement.get('settlement_date') else ''}"
-                        )
-                        if settlement.get("actual_credit_date"):
-                            response_parts.append(f"   Credited Date: {settlement['actual_credit_date'][:10]}")
-                
-                if nostro_credit.get("summary"):
-                    summary = nostro_credit["summary"]
-                    response_parts.append(
-                        f"**Summary:**\n"
-                        f"Total Settlements: {summary.get('total_settlements', 0)}\n"
-                        f"Credited: {summary.get('credited_count', 0)} (EUR {summary.get('total_credited_amount', 0):,.2f})\n"
-                        f"Pending: {summary.get('pending_count', 0)} (EUR {summary.get('total_pending_amount', 0):,.2f})"
-                    )
-        
-        # Nostro accounts results
-        nostro_accounts = state.get("nostro_accounts")
-        if nostro_accounts:
-            if isinstance(nostro_accounts, dict) and "error" in nostro_accounts:
-                response_parts.append(f"**Nostro Accounts Error:** {nostro_accounts['error']}")
-            else:
-                response_parts.append(f"**Nostro Accounts ({nostro_accounts.get('currency_filter', 'all')} filter):**")
-                response_parts.append(f"Total Count: {nostro_accounts.get('total_count', 0)}")
-                
-                for i, acc in enumerate(nostro_accounts.get("accounts", []), 1):
-                    response_parts.append(
-                        f"{i}. Account ID: {acc.get('account_id', '')}\n"
-                        f"   Currency: {acc.get('currency', '')}\n"
-                        f"   Type: {acc.get('account_type', '')}\n"
-                        f"   Correspondent: {acc.get('correspondent_bank', '')}\n"
-                        f"   SWIFT: {acc.get('correspondent_swift', '')}\n"
-                        f"   Balance: {acc.get('currency', '')} {acc.get('balance', 0):,.2f}\n"
-                        f"   Status: {acc.get('account_status', '')}"
-                    )
+        for key, formatter in FORMATTERS.items():
+            section = formatter(getattr(state, key))
+            if section:
+                response_parts.append(section)
         
         if not response_parts:
-            response_parts.append("No actions were performed. Please specify what you'd like to do.")
+            response_parts.append(NO_ACTIONS_MESSAGE)
         
-        state["final_response"] = "\n\n".join(response_parts)
+        state.final_response = "\n\n".join(response_parts)
         return state
     
-    def process_request(self, user_input: str) -> str:
-        """Process a user request through the graph"""
-        initial_state = PaymentGraphState(
+    def _initial_state(self, user_input: str) -> PaymentGraphState:
+        """Build the initial graph state for a user request"""
+        return PaymentGraphState(
             messages=[HumanMessage(content=user_input)],
-            user_input=user_input,
-            action_needed=[],
-            transactions=None,
-            relationship_manager=None,
-            dispute_details=None,
-            verification_result=None,
-            nostro_credit_result=None,
-            nostro_accounts=None,
-            final_response=""
+            user_input=user_input
         )
-        
+    
+    def process_request(self, user_input: str) -> str:
+        """Process a user request through the graph"""
         # Run the graph
-        result = self.compiled_graph.invoke(initial_state)
+        result = self.compiled_graph.invoke(self._initial_state(user_input))
         return result["final_response"]
+    
+    async def aprocess_request_stream(self, user_input: str) -> AsyncIterator[str]:
+        """Process a user request, yielding each response section as soon as its node completes"""
+        emitted = False
+        async for update in self.streaming_graph.astream(self._initial_state(user_input), stream_mode="updates"):
+            for node, values in update.items():
+                key = NODE_OUTPUTS.get(node)
+                if key is None or not values:
+                    continue
+                # Updates arrive as dicts, or as the state object a node returned
+                value = values.get(key) if isinstance(values, dict) else getattr(values, key, None)
+                section = FORMATTERS[key](value)
+                if section:
+                    emitted = True
+                    yield section
+        
+        if not emitted:
+            yield NO_ACTIONS_MESSAGE
 
 # Global orchestrator instance
 payment_orchestrator = PaymentOrchestrator()
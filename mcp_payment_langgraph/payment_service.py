@@ -1,17 +1,256 @@
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import json
+import os
+import sqlite3
 import time
 import sys
+from itertools import count, groupby
+from operator import itemgetter
 from datetime import datetime, timedelta
 from database import payment_db
 from customer_manager import customer_manager
-from logger import request_logger, log_execution_time
+from logger import request_logger, log_execution_time, elapsed_ms
+
+# Record ids come from a counter seeded with the start time in ms, so ids stay
+# unique within the process however fast they are minted; the random suffix
+# keeps separate processes from colliding
+_id_counter = count(int(time.time() * 1000))
+
+def _mint_id(prefix: str) -> str:
+    """Return a new record id such as SR_1792104832844_9f3a"""
+    return f"{prefix}_{next(_id_counter)}_{os.urandom(2).hex()}"
+
+# SQL statements are module-level constants so every call passes the same
+# string object and hits the connection's statement cache. Listings generate
+# their SELECT list from a column tuple, so rows can be zipped positionally by
+# a factory built once at import
+def _make_row_factory(cols: Tuple[str, ...]) -> Callable[[Any], Dict[str, Any]]:
+    """Return a function that turns a row selected as cols into a dict"""
+    return lambda row: dict(zip(cols, row))
+
+_TXN_COLS = (
+    "transaction_id", "customer_id", "account_number", "amount", "currency",
+    "status", "transaction_date", "description", "recipient_name",
+    "recipient_account", "transaction_type"
+)
+_SQL_GET_TXNS = f"""
+    SELECT {', '.join(_TXN_COLS)}
+    FROM high_value_transactions 
+    WHERE customer_id = ? 
+      AND amount >= ?
+      AND transaction_date >= ?
+    ORDER BY transaction_date DESC 
+    LIMIT ?
+"""
+_TXN_ROW = _make_row_factory(_TXN_COLS)
+
+_SQL_GET_RM = """
+    SELECT rm.manager_id, rm.name, rm.email, rm.phone, rm.specialization, 
+           rm.experience_years, rm.branch
+    FROM relationship_managers rm
+    INNER JOIN customers c ON c.relationship_manager_id = rm.manager_id
+    WHERE c.customer_id = ?
+"""
+
+_SQL_CHECK_TXN = """
+    SELECT transaction_id, amount, currency, status, account_number
+    FROM high_value_transactions 
+    WHERE transaction_id = ? AND customer_id = ?
+"""
+
+_SQL_INS_DISPUTE = """
+    INSERT INTO disputes 
+    (dispute_id, transaction_id, customer_id, customer_account, dispute_reason, status, 
+     created_date, resolution_date, assigned_to, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_GET_VERIFY = """
+    SELECT verification_id, transaction_id, is_credited, credited_amount,
+           credited_date, verification_status, notes
+    FROM transaction_verifications 
+    WHERE transaction_id = ? AND customer_id = ?
+"""
+
+# Creates the verification from the transaction in one statement; the unique
+# (transaction_id, customer_id) index turns a concurrent duplicate into a no-op
+_SQL_INS_VERIFY = """
+    INSERT INTO transaction_verifications 
+    (verification_id, transaction_id, customer_id, is_credited, credited_amount,
+     credited_date, verification_status, notes)
+    SELECT ?, transaction_id, customer_id, status = 'completed',
+           CASE WHEN status = 'completed' THEN amount END,
+           CASE WHEN status = 'completed' THEN ? END,
+           CASE WHEN status = 'completed' THEN 'verified' ELSE 'pending' END,
+           'Auto-generated verification record'
+    FROM high_value_transactions
+    WHERE transaction_id = ? AND customer_id = ?
+    ON CONFLICT(transaction_id, customer_id) DO NOTHING
+    RETURNING verification_id, transaction_id, is_credited, credited_amount,
+              credited_date, verification_status, notes
+"""
+
+# get_nostro_accounts: accounts LEFT JOINed to the customer's latest EUR
+# settlements, keyed by (export_reference given, currency given). The summary
+# totals over those settlements are computed by window aggregates on every row
+_SQL_NOSTRO_TEMPLATE = """
+    SELECT n.account_id, n.currency, n.account_type, n.correspondent_bank,
+           n.correspondent_swift, n.balance, n.available_balance, 
+           n.last_updated, n.account_status,
+           s.settlement_id, s.amount, s.export_reference, s.counterparty,
+           s.settlement_date, s.actual_credit_date, s.status,
+           s.credited_count, s.pending_count, s.total_credited, s.total_pending
+    FROM nostro_accounts n
+    LEFT JOIN (
+        SELECT *,
+               SUM(status = 'credited') OVER () AS credited_count,
+               SUM(status = 'pending') OVER () AS pending_count,
+               TOTAL(CASE WHEN status = 'credited' THEN amount END) OVER () AS total_credited,
+               TOTAL(CASE WHEN status = 'pending' THEN amount END) OVER () AS total_pending
+        FROM (
+            SELECT settlement_id, amount, export_reference, counterparty, 
+                   settlement_date, actual_credit_date, status
+            FROM euro_nostro_settlements 
+            WHERE customer_id = ?{reference_filter}
+            ORDER BY settlement_date DESC LIMIT 10
+        )
+    ) s ON n.currency = 'EUR'
+    {currency_filter}
+    ORDER BY n.currency, n.balance DESC, n.account_id, s.settlement_date DESC
+"""
+_SQL_NOSTRO = {
+    (by_reference, by_currency): _SQL_NOSTRO_TEMPLATE.format(
+        reference_filter=" AND export_reference = ?" if by_reference else "",
+        currency_filter="WHERE n.currency = ?" if by_currency else "",
+    )
+    for by_reference in (False, True)
+    for by_currency in (False, True)
+}
+
+_TREASURY_COLS = ("pricing_id", "currency_pair", "rate", "margin", "valid_until", "pricing_tier")
+_SQL_TREASURY = f"""
+    SELECT {', '.join(_TREASURY_COLS)}
+    FROM treasury_pricing 
+    WHERE customer_id = ? AND valid_until > CURRENT_TIMESTAMP
+    ORDER BY currency_pair
+"""
+_TREASURY_ROW = _make_row_factory(_TREASURY_COLS)
+
+_INVEST_COLS = (
+    "proposal_id", "product_type", "amount", "currency", "expected_return",
+    "risk_level", "proposal_date", "status", "maturity_date"
+)
+_SQL_INVEST = f"""
+    SELECT {', '.join(_INVEST_COLS)}
+    FROM investment_proposals 
+    WHERE customer_id = ?
+    ORDER BY proposal_date DESC
+"""
+_INVEST_ROW = _make_row_factory(_INVEST_COLS)
+
+_FORECAST_COLS = (
+    "forecast_id", "forecast_date", "currency", "opening_balance",
+    "projected_inflows", "projected_outflows", "closing_balance", "confidence_level"
+)
+_SQL_FORECASTS = f"""
+    SELECT {', '.join(_FORECAST_COLS)}
+    FROM cash_forecasts 
+    WHERE customer_id = ?
+    ORDER BY forecast_date
+"""
+_FORECAST_ROW = _make_row_factory(_FORECAST_COLS)
+
+_RISK_LIMIT_COLS = (
+    "limit_id", "limit_type", "limit_amount", "currency", "utilization",
+    "utilization_percentage", "available_limit"
+)
+# available_limit is computed in SQL; the remaining columns are read as stored
+_SQL_RISK_LIMITS = f"""
+    SELECT {', '.join(_RISK_LIMIT_COLS[:-1])},
+           limit_amount - utilization AS available_limit
+    FROM risk_limits 
+    WHERE customer_id = ?
+    ORDER BY limit_type
+"""
 
 class PaymentAPIService:
     """Service class to handle all payment-related API operations with database integration"""
     
-    def __init__(self):
-        pass  # No more mock data generator needed
+    # Bounds for the in-process read caches
+    CACHE_MAXSIZE = 128
+    NOSTRO_CACHE_TTL_SECONDS = 5.0
+    RM_CACHE_TTL_SECONDS = 300.0
+    LIMITS_CACHE_TTL_SECONDS = 30.0
+    # Pricing is cached until its earliest valid_until (less a margin), capped here
+    PRICING_CACHE_MAX_TTL_SECONDS = 300.0
+    PRICING_EXPIRY_MARGIN_SECONDS = 5.0
+    
+    # Rows pulled per fetchmany() call when materializing result sets; risk
+    # limits are a handful of rows per customer, so they use smaller batches
+    FETCH_ARRAYSIZE = 1000
+    LIMITS_FETCH_ARRAYSIZE = 64
+    
+    def __init__(self) -> None:
+        # (customer_id, currency, export_reference) -> (result, expires_at)
+        self._nostro_cache: Dict[Tuple[str, Optional[str], Optional[str]], Tuple[Dict[str, Any], float]] = {}
+        # customer_id -> (result, expires_at)
+        self._rm_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._pricing_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._limits_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+    
+    def _cache_get(self, cache: Dict[Any, Tuple[Any, float]], key: Any) -> Optional[Any]:
+        """Return a cached value if present and not yet expired"""
+        hit = cache.get(key)
+        if hit and hit[1] > time.time():
+            return hit[0]
+        return None
+    
+    def _cache_put(self, cache: Dict[Any, Tuple[Any, float]], key: Any, value: Any, expires_at: float) -> None:
+        """Store a value until expires_at, evicting the oldest entry when full"""
+        if key not in cache and len(cache) >= self.CACHE_MAXSIZE:
+            cache.pop(next(iter(cache)))
+        cache[key] = (value, expires_at)
+    
+    def _log_cache_hit(self, request_type: str, request_data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Audit-log a response served from cache, as the uncached path does"""
+        request_logger.log_request_response(request_type, {**request_data, "cached": True}, result, elapsed_ms())
+    
+    def _resolve_customer_id(self, customer_id: Optional[str] = None) -> str:
+        """Return the given customer_id, falling back to the current customer context"""
+        if customer_id:
+            return customer_id
+        current_customer = customer_manager.get_current_customer()
+        if not current_customer:
+            raise ValueError("No customer context available")
+        return current_customer['customer_id']
+    
+    def _iter_rows(self, cursor: sqlite3.Cursor, arraysize: Optional[int] = None) -> Iterator[sqlite3.Row]:
+        """Yield a cursor's rows in fetchmany batches instead of one fetchall list"""
+        cursor.arraysize = arraysize or self.FETCH_ARRAYSIZE
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                return
+            yield from rows
+    
+    def invalidate_nostro_cache(self) -> None:
+        """Drop cached nostro results; call after writing nostro accounts or settlements"""
+        self._nostro_cache.clear()
+    
+    def invalidate_rm_cache(self) -> None:
+        """Drop cached relationship manager details; call after reassigning managers"""
+        self._rm_cache.clear()
+    
+    def invalidate_pricing_cache(self) -> None:
+        """Drop cached treasury pricing; call after writing treasury_pricing"""
+        self._pricing_cache.clear()
+    
+    def invalidate_limits_cache(self, customer_id: Optional[str] = None) -> None:
+        """Drop cached risk limits for one customer, or for all; call after writing risk_limits"""
+        if customer_id is None:
+            self._limits_cache.clear()
+        else:
+            self._limits_cache.pop(customer_id, None)
     
     @log_execution_time
     def get_transactions(
@@ -33,14 +272,8 @@ class PaymentAPIService:
         Returns:
             List of high value transactions
         """
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
         
         try:
             with payment_db.get_connection() as conn:
@@ -49,36 +282,12 @@ class PaymentAPIService:
                 # Calculate date filter
                 cutoff_date = datetime.now() - timedelta(days=days_filter)
                 
-                cursor.execute("""
-                    SELECT transaction_id, customer_id, account_number, amount, currency, 
-                           status, transaction_date, description, recipient_name, 
-                           recipient_account, transaction_type
-                    FROM high_value_transactions 
-                    WHERE customer_id = ? 
-                      AND amount >= ?
-                      AND transaction_date >= ?
-                    ORDER BY transaction_date DESC 
-                    LIMIT ?
-                """, (customer_id, min_amount, cutoff_date.isoformat(), limit))
-                
-                transactions = []
-                for row in cursor.fetchall():
-                    transactions.append({
-                        "transaction_id": row['transaction_id'],
-                        "customer_id": row['customer_id'],
-                        "account_number": row['account_number'],
-                        "amount": row['amount'],
-                        "currency": row['currency'],
-                        "status": row['status'],
-                        "transaction_date": row['transaction_date'],
-                        "description": row['description'],
-                        "recipient_name": row['recipient_name'],
-                        "recipient_account": row['recipient_account'],
-                        "transaction_type": row['transaction_type']
-                    })
+                cursor.execute(_SQL_GET_TXNS, (customer_id, min_amount, cutoff_date.isoformat(), limit))
+                
+                transactions = list(map(_TXN_ROW, self._iter_rows(cursor)))
                 
                 # Log request and response
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_transactions",
                     {"customer_id": customer_id, "limit": limit, "days_filter": days_filter, "min_amount": min_amount},
@@ -101,28 +310,22 @@ class PaymentAPIService:
             customer_id: Optional customer ID override
             
         Returns:
-            Relationship manager details
+            Relationship manager details.
+            Results are cached and shared, so callers must not mutate them.
         """
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
+        
+        cached = self._cache_get(self._rm_cache, customer_id)
+        if cached is not None:
+            self._log_cache_hit("get_relationship_manager_details", {"customer_id": customer_id}, cached)
+            return cached
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT rm.manager_id, rm.name, rm.email, rm.phone, rm.specialization, 
-                           rm.experience_years, rm.branch
-                    FROM relationship_managers rm
-                    INNER JOIN customers c ON c.relationship_manager_id = rm.manager_id
-                    WHERE c.customer_id = ?
-                """, (customer_id,))
+                cursor.execute(_SQL_GET_RM, (customer_id,))
                 
                 rm = cursor.fetchone()
                 if not rm:
@@ -136,12 +339,14 @@ class PaymentAPIService:
                     "phone": rm['phone'],
                     "specialization": rm['specialization'],
                     "experience_years": rm['experience_years'],
-                    "department": rm['branch'] if 'branch' in rm.keys() else 'Not specified',
+                    "department": rm['branch'],
                     "availability_hours": 'Standard business hours'
                 }
                 
+                self._cache_put(self._rm_cache, customer_id, result, time.time() + self.RM_CACHE_TTL_SECONDS)
+                
                 # Log request and response
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_relationship_manager_details",
                     {"customer_id": customer_id},
@@ -155,6 +360,56 @@ class PaymentAPIService:
             request_logger.log_error("get_relationship_manager_details", str(e), {"customer_id": customer_id})
             raise
     
+    def _create_servicerequests(
+        self,
+        conn: sqlite3.Connection,
+        customer_id: str,
+        items: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Insert a service request per (transaction_id, reason) pair in one write transaction"""
+        cursor = conn.cursor()
+        
+        # Take the write lock up front; all requests commit together or not at all
+        cursor.execute("BEGIN IMMEDIATE")
+        
+        # The stored rows and the responses share one timestamp
+        created_date = datetime.now().isoformat()
+        rows = []
+        results = []
+        for transaction_id, servicerequest_reason in items:
+            # Check if transaction exists
+            cursor.execute(_SQL_CHECK_TXN, (transaction_id, customer_id))
+            
+            transaction = cursor.fetchone()
+            if not transaction:
+                raise ValueError(f"Transaction {transaction_id} not found for customer {customer_id}")
+            
+            # Get customer account from transaction
+            customer_account = transaction['account_number']
+            if not customer_account:
+                raise ValueError(f"Account number not found for transaction {transaction_id}")
+            
+            servicerequest_id = _mint_id("SR")
+            rows.append((
+                servicerequest_id, transaction_id, customer_id, customer_account, servicerequest_reason, 'open',
+                created_date, None, 'Support Team', 
+                f'Service request created for transaction {transaction_id}'
+            ))
+            results.append({
+                "servicerequest_id": servicerequest_id,
+                "transaction_id": transaction_id,
+                "customer_id": customer_id,
+                "customer_account": customer_account,
+                "servicerequest_reason": servicerequest_reason,
+                "status": "open",
+                "created_date": created_date,
+                "assigned_to": "Support Team"
+            })
+        
+        cursor.executemany(_SQL_INS_DISPUTE, rows)
+        cursor.execute("COMMIT")
+        return results
+    
     @log_execution_time
     def raise_servicerequest(self, transaction_id: str, servicerequest_reason: str, customer_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -168,62 +423,15 @@ class PaymentAPIService:
         Returns:
             Service request details
         """
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
         
         try:
             with payment_db.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Check if transaction exists
-                cursor.execute("""
-                    SELECT transaction_id, amount, currency, status, account_number
-                    FROM high_value_transactions 
-                    WHERE transaction_id = ? AND customer_id = ?
-                """, (transaction_id, customer_id))
-                
-                transaction = cursor.fetchone()
-                if not transaction:
-                    raise ValueError(f"Transaction {transaction_id} not found for customer {customer_id}")
-                
-                # Get customer account from transaction
-                customer_account = transaction['account_number'] if 'account_number' in transaction.keys() else None
-                if not customer_account:
-                    raise ValueError(f"Account number not found for transaction {transaction_id}")
-                
-                # Create service request
-                servicerequest_id = f"SR_{int(time.time() * 1000)}"
-                
-                cursor.execute("""
-                    INSERT INTO disputes 
-                    (dispute_id, transaction_id, customer_id, customer_account, dispute_reason, status, 
-                     created_date, resolution_date, assigned_to, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (servicerequest_id, transaction_id, customer_id, customer_account, servicerequest_reason, 'open',
-                     datetime.now().isoformat(), None, 'Support Team', 
-                     f'Service request created for transaction {transaction_id}') )
-                
-                conn.commit()
-                
-                result = {
-                    "servicerequest_id": servicerequest_id,
-                    "transaction_id": transaction_id,
-                    "customer_id": customer_id,
-                    "customer_account": customer_account,
-                    "servicerequest_reason": servicerequest_reason,
-                    "status": "open",
-                    "created_date": datetime.now().isoformat(),
-                    "assigned_to": "Support Team"
-                }
+                result = self._create_servicerequests(conn, customer_id, [(transaction_id, servicerequest_reason)])[0]
                 
                 # Log request and response
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "raise_servicerequest",
                     {"transaction_id": transaction_id, "servicerequest_reason": servicerequest_reason, "customer_id": customer_id},
@@ -237,6 +445,45 @@ class PaymentAPIService:
             request_logger.log_error("raise_servicerequest", str(e), {"transaction_id": transaction_id, "customer_id": customer_id})
             raise
     
+    @log_execution_time
+    def raise_servicerequests_bulk(
+        self,
+        items: List[Tuple[str, str]],
+        customer_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Raise service requests for several transactions in a single commit
+        
+        Args:
+            items: (transaction_id, servicerequest_reason) pairs
+            customer_id: Optional customer ID override
+            
+        Returns:
+            Service request details in the order of items; if any transaction
+            is not found, nothing is written
+        """
+        # Get current customer context
+        customer_id = self._resolve_customer_id(customer_id)
+        
+        try:
+            with payment_db.get_connection() as conn:
+                results = self._create_servicerequests(conn, customer_id, items)
+                
+                # Log request and response
+                execution_time = elapsed_ms()
+                request_logger.log_request_response(
+                    "raise_servicerequests_bulk",
+                    {"items": items, "customer_id": customer_id},
+                    {"servicerequest_count": len(results), "servicerequests": results},
+                    execution_time
+                )
+                
+                return results
+                
+        except Exception as e:
+            request_logger.log_error("raise_servicerequests_bulk", str(e), {"item_count": len(items), "customer_id": customer_id})
+            raise
+    
     @log_execution_time
     def verify_transaction_credit(self, transaction_id: str, customer_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -249,82 +496,50 @@ class PaymentAPIService:
         Returns:
             Verification details
         """
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT verification_id, transaction_id, is_credited, credited_amount,
-                           credited_date, verification_status, notes
-                    FROM transaction_verifications 
-                    WHERE transaction_id = ? AND customer_id = ?
-                """, (transaction_id, customer_id))
+                cursor.execute(_SQL_GET_VERIFY, (transaction_id, customer_id))
                 
                 verification = cursor.fetchone()
                 
-                if verification:
-                    result = {
-                        "transaction_id": verification['transaction_id'],
-                        "is_credited": bool(verification['is_credited']),
-                        "verification_status": verification['verification_status'],
-                        "notes": verification['notes']
-                    }
-                    
-                    if verification['credited_amount']:
-                        result["credited_amount"] = verification['credited_amount']
-                    
-                    if verification['credited_date']:
-                        result["credited_date"] = verification['credited_date']
-                else:
+                if not verification:
                     # Create new verification if doesn't exist
-                    cursor.execute("""
-                        SELECT transaction_id, status, amount, currency
-                        FROM high_value_transactions 
-                        WHERE transaction_id = ? AND customer_id = ?
-                    """, (transaction_id, customer_id))
+                    verification_id = _mint_id("VER")
+                    cursor.execute(_SQL_INS_VERIFY, (
+                        verification_id, datetime.now().isoformat(), transaction_id, customer_id
+                    ))
+                    # A single autocommit statement: it commits once RETURNING is drained
+                    inserted = cursor.fetchall()
                     
-                    transaction = cursor.fetchone()
-                    if not transaction:
-                        raise ValueError(f"Transaction {transaction_id} not found for customer {customer_id}")
-                    
-                    is_credited = transaction['status'] == 'completed'
-                    verification_id = f"VER_{int(time.time() * 1000)}"
-                    
-                    cursor.execute("""
-                        INSERT INTO transaction_verifications 
-                        (verification_id, transaction_id, customer_id, is_credited, credited_amount,
-                         credited_date, verification_status, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (verification_id, transaction_id, customer_id, is_credited,
-                         transaction['amount'] if is_credited else None,
-                         datetime.now().isoformat() if is_credited else None,
-                         'verified' if is_credited else 'pending',
-                         'Auto-generated verification record'))
-                    
-                    conn.commit()
-                    
-                    result = {
-                        "transaction_id": transaction_id,
-                        "is_credited": is_credited,
-                        "verification_status": 'verified' if is_credited else 'pending',
-                        "notes": 'Auto-generated verification record'
-                    }
-                    
-                    if is_credited:
-                        result["credited_amount"] = transaction['amount']
-                        result["credited_date"] = datetime.now().isoformat()
+                    if inserted:
+                        verification = inserted[0]
+                    else:
+                        # Either no such transaction or another caller created it first
+                        cursor.execute(_SQL_GET_VERIFY, (transaction_id, customer_id))
+                        verification = cursor.fetchone()
+                        if not verification:
+                            raise ValueError(f"Transaction {transaction_id} not found for customer {customer_id}")
+                
+                result = {
+                    "transaction_id": verification['transaction_id'],
+                    "is_credited": bool(verification['is_credited']),
+                    "verification_status": verification['verification_status'],
+                    "notes": verification['notes']
+                }
+                
+                if verification['credited_amount']:
+                    result["credited_amount"] = verification['credited_amount']
+                
+                if verification['credited_date']:
+                    result["credited_date"] = verification['credited_date']
                 
                 # Log request and response
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "verify_transaction_credit",
                     {"transaction_id": transaction_id, "customer_id": customer_id},
@@ -338,6 +553,39 @@ class PaymentAPIService:
             request_logger.log_error("verify_transaction_credit", str(e), {"transaction_id": transaction_id, "customer_id": customer_id})
             raise
     
+    def _build_settlements(
+        self,
+        rows: List[sqlite3.Row],
+        settlement_cols: Tuple[str, ...],
+        export_reference: Optional[str]
+    ) -> Tuple[Dict[str, Any], str]:
+        """Build the settlements block and settlement_status for an EUR account's joined rows"""
+        first = rows[0]
+        if first['settlement_id'] is None:
+            # LEFT JOIN placeholder row: no settlements matched
+            settlements_data: List[Dict[str, Any]] = []
+        else:
+            settlements_data = [dict(zip(settlement_cols, row[9:16])) for row in rows]
+        
+        settlements = {
+            "settlements": settlements_data,
+            "summary": {
+                "total_settlements": len(settlements_data),
+                "credited_count": first['credited_count'] or 0,
+                "pending_count": first['pending_count'] or 0,
+                "total_credited_amount": first['total_credited'] or 0.0,
+                "total_pending_amount": first['total_pending'] or 0.0
+            }
+        }
+        
+        if settlements_data:
+            status = "settlements_found"
+        elif export_reference:
+            status = "no_settlements_for_reference"
+        else:
+            status = "no_recent_settlements"
+        return settlements, status
+    
     @log_execution_time
     def get_nostro_accounts(self, currency: Optional[str] = None, export_reference: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -348,115 +596,51 @@ class PaymentAPIService:
             export_reference: For EUR currency, specific export reference to check settlements
             
         Returns:
-            List of nostro accounts with settlement details for EUR
+            List of nostro accounts with settlement details for EUR.
+            Results are cached briefly and shared, so callers must not mutate them.
         """
-        start_time = time.time()
-        
         # Get current customer context
-        current_customer = customer_manager.get_current_customer()
-        if not current_customer:
-            raise ValueError("No customer context available")
-        customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id()
+        
+        cache_key = (customer_id, currency, export_reference)
+        cached = self._cache_get(self._nostro_cache, cache_key)
+        if cached is not None:
+            self._log_cache_hit("get_nostro_accounts", {"currency": currency, "export_reference": export_reference}, cached)
+            return cached
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                if (currency):
-                    cursor.execute("""
-                        SELECT account_id, currency, account_type, correspondent_bank,
-                               correspondent_swift, balance, available_balance, 
-                               last_updated, account_status
-                        FROM nostro_accounts 
-                        WHERE currency = ?
-                        ORDER BY balance DESC
-                    """, (currency,))
-                else:
-                    cursor.execute("""
-                        SELECT account_id, currency, account_type, correspondent_bank,
-                               correspondent_swift, balance, available_balance, 
-                               last_updated, account_status
-                        FROM nostro_accounts 
-                        ORDER BY currency, balance DESC
-                    """)
+                # One round trip: EUR accounts pick up the customer's latest
+                # settlements through a LEFT JOIN instead of a query per account
+                params: List[Any] = [customer_id]
+                if export_reference:
+                    params.append(export_reference)
+                if currency:
+                    params.append(currency)
+                
+                cursor.execute(_SQL_NOSTRO[bool(export_reference), bool(currency)], params)
+                
+                # Columns 0-8 describe the account, 9-15 the settlement, 16-19 the summary
+                cols = tuple(d[0] for d in cursor.description)
+                account_cols, settlement_cols = cols[:9], cols[9:16]
+                
+                # Settlements are filtered by customer, not by account, so every EUR
+                # account gets the same block: build it once and share it
+                eur_settlements: Optional[Tuple[Dict[str, Any], str]] = None
                 
                 accounts = []
-                for row in cursor.fetchall():
-                    account_data = {
-                        "account_id": row['account_id'],
-                        "currency": row['currency'],
-                        "account_type": row['account_type'],
-                        "correspondent_bank": row['correspondent_bank'],
-                        "correspondent_swift": row['correspondent_swift'],
-                        "balance": row['balance'],
-                        "available_balance": row['available_balance'],
-                        "last_updated": row['last_updated'],
-                        "account_status": row['account_status']
-                    }
+                for _, group in groupby(self._iter_rows(cursor), key=itemgetter('account_id')):
+                    rows = list(group)
+                    row = rows[0]
+                    account_data = dict(zip(account_cols, row))
                     
                     # Add settlement details for EUR accounts
                     if row['currency'] == 'EUR':
-                        # Get settlements for this customer
-                        settlement_query = """
-                            SELECT settlement_id, amount, export_reference, counterparty, 
-                                   settlement_date, actual_credit_date, status
-                            FROM euro_nostro_settlements 
-                            WHERE customer_id = ?
-                        """
-                        settlement_params = [customer_id]
-                        
-                        if export_reference:
-                            settlement_query += " AND export_reference = ?"
-                            settlement_params.append(export_reference)
-                        
-                        settlement_query += " ORDER BY settlement_date DESC LIMIT 10"
-                        
-                        cursor.execute(settlement_query, settlement_params)
-                        settlements = cursor.fetchall()
-                        
-                        # Process settlements
-                        settlements_data = []
-                        total_credited = 0
-                        total_pending = 0
-                        credited_count = 0
-                        pending_count = 0
-                        
-                        for settlement in settlements:
-                            settlement_data = {
-                                "settlement_id": settlement['settlement_id'],
-                                "amount": settlement['amount'],
-                                "export_reference": settlement['export_reference'],
-                                "counterparty": settlement['counterparty'],
-                                "settlement_date": settlement['settlement_date'],
-                                "actual_credit_date": settlement['actual_credit_date'],
-                                "status": settlement['status']
-                            }
-                            settlements_data.append(settlement_data)
-                            
-                            if settlement['status'] == 'credited':
-                                total_credited += settlement['amount']
-                                credited_count += 1
-                            elif settlement['status'] == 'pending':
-                                total_pending += settlement['amount']
-                                pending_count += 1
-                        
-                        account_data['settlements'] = {
-                            "settlements": settlements_data,
-                            "summary": {
-                                "total_settlements": len(settlements_data),
-                                "credited_count": credited_count,
-                                "pending_count": pending_count,
-                                "total_credited_amount": total_credited,
-                                "total_pending_amount": total_pending
-                            }
-                        }
-                        
-                        if settlements_data:
-                            account_data['settlement_status'] = "settlements_found"
-                        elif export_reference:
-                            account_data['settlement_status'] = "no_settlements_for_reference"
-                        else:
-                            account_data['settlement_status'] = "no_recent_settlements"
+                        if eur_settlements is None:
+                            eur_settlements = self._build_settlements(rows, settlement_cols, export_reference)
+                        account_data['settlements'], account_data['settlement_status'] = eur_settlements
                     
                     accounts.append(account_data)
                 
@@ -466,8 +650,10 @@ class PaymentAPIService:
                     "currency_filter": currency or "all"
                 }
                 
+                self._cache_put(self._nostro_cache, cache_key, result, time.time() + self.NOSTRO_CACHE_TTL_SECONDS)
+                
                 # Log request and response
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_nostro_accounts",
                     {"currency": currency, "export_reference": export_reference},
@@ -485,37 +671,22 @@ class PaymentAPIService:
     
     @log_execution_time
     def get_treasury_pricing(self, customer_id: Optional[str] = None) -> Dict[str, Any]:
-        """Get treasury FX pricing for customer"""
-        start_time = time.time()
-        
+        """Get treasury FX pricing for customer (cached until a rate expires; do not mutate)"""
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
+        
+        cached = self._cache_get(self._pricing_cache, customer_id)
+        if cached is not None:
+            self._log_cache_hit("get_treasury_pricing", {"customer_id": customer_id}, cached)
+            return cached
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT pricing_id, currency_pair, rate, margin, valid_until, pricing_tier
-                    FROM treasury_pricing 
-                    WHERE customer_id = ? AND valid_until > CURRENT_TIMESTAMP
-                    ORDER BY currency_pair
-                """, (customer_id,))
-                
-                pricing_data = []
-                for row in cursor.fetchall():
-                    pricing_data.append({
-                        "pricing_id": row['pricing_id'],
-                        "currency_pair": row['currency_pair'],
-                        "rate": row['rate'],
-                        "margin": row['margin'],
-                        "valid_until": row['valid_until'],
-                        "pricing_tier": row['pricing_tier']
-                    })
+                cursor.execute(_SQL_TREASURY, (customer_id,))
+                
+                pricing_data = list(map(_TREASURY_ROW, self._iter_rows(cursor)))
                 
                 result = {
                     "customer_id": customer_id,
@@ -523,7 +694,16 @@ class PaymentAPIService:
                     "total_pairs": len(pricing_data)
                 }
                 
-                execution_time = int((time.time() - start_time) * 1000)
+                # Stop serving the cached rates just before the first one expires
+                now = time.time()
+                expires_at = now + self.PRICING_CACHE_MAX_TTL_SECONDS
+                for pricing in pricing_data:
+                    valid_until = datetime.fromisoformat(pricing["valid_until"]).timestamp()
+                    expires_at = min(expires_at, valid_until - self.PRICING_EXPIRY_MARGIN_SECONDS)
+                if expires_at > now:
+                    self._cache_put(self._pricing_cache, customer_id, result, expires_at)
+                
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_treasury_pricing",
                     {"customer_id": customer_id},
@@ -540,40 +720,16 @@ class PaymentAPIService:
     @log_execution_time 
     def get_investment_proposals(self, customer_id: Optional[str] = None) -> Dict[str, Any]:
         """Get investment proposals for customer"""
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT proposal_id, product_type, amount, currency, expected_return,
-                           risk_level, proposal_date, status, maturity_date
-                    FROM investment_proposals 
-                    WHERE customer_id = ?
-                    ORDER BY proposal_date DESC
-                """, (customer_id,))
-                
-                proposals = []
-                for row in cursor.fetchall():
-                    proposals.append({
-                        "proposal_id": row['proposal_id'],
-                        "product_type": row['product_type'],
-                        "amount": row['amount'],
-                        "currency": row['currency'],
-                        "expected_return": row['expected_return'],
-                        "risk_level": row['risk_level'],
-                        "proposal_date": row['proposal_date'],
-                        "status": row['status'],
-                        "maturity_date": row['maturity_date']
-                    })
+                cursor.execute(_SQL_INVEST, (customer_id,))
+                
+                proposals = list(map(_INVEST_ROW, self._iter_rows(cursor)))
                 
                 result = {
                     "customer_id": customer_id,
@@ -581,7 +737,7 @@ class PaymentAPIService:
                     "total_proposals": len(proposals)
                 }
                 
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_investment_proposals",
                     {"customer_id": customer_id},
@@ -600,39 +756,16 @@ class PaymentAPIService:
     @log_execution_time
     def get_cash_forecasts(self, customer_id: Optional[str] = None, days: int = 30) -> Dict[str, Any]:
         """Get cash forecasts for customer"""
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT forecast_id, forecast_date, currency, opening_balance, 
-                           projected_inflows, projected_outflows, closing_balance, confidence_level
-                    FROM cash_forecasts 
-                    WHERE customer_id = ?
-                    ORDER BY forecast_date
-                """, (customer_id,))
-                
-                forecasts = []
-                for row in cursor.fetchall():
-                    forecasts.append({
-                        "forecast_id": row['forecast_id'],
-                        "forecast_date": row['forecast_date'],
-                        "currency": row['currency'],
-                        "opening_balance": row['opening_balance'],
-                        "projected_inflows": row['projected_inflows'],
-                        "projected_outflows": row['projected_outflows'],
-                        "closing_balance": row['closing_balance'],
-                        "confidence_level": row['confidence_level']
-                    })
+                cursor.execute(_SQL_FORECASTS, (customer_id,))
+                
+                forecasts = list(map(_FORECAST_ROW, self._iter_rows(cursor)))
                 
                 result = {
                     "customer_id": customer_id,
@@ -641,7 +774,7 @@ class PaymentAPIService:
                     "forecast_period_days": days
                 }
                 
-                execution_time = int((time.time() - start_time) * 1000)
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_cash_forecasts",
                     {"customer_id": customer_id, "days": days},
@@ -658,39 +791,29 @@ class PaymentAPIService:
     @log_execution_time
     def get_risk_limits(self, customer_id: Optional[str] = None) -> Dict[str, Any]:
         """Get risk limits for customer"""
-        start_time = time.time()
-        
         # Get current customer context
-        if not customer_id:
-            current_customer = customer_manager.get_current_customer()
-            if not current_customer:
-                raise ValueError("No customer context available")
-            customer_id = current_customer['customer_id']
+        customer_id = self._resolve_customer_id(customer_id)
+        
+        last_updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Limits change rarely; a cached copy is re-stamped with this call's time
+        cached = self._cache_get(self._limits_cache, customer_id)
+        if cached is not None:
+            limits = [dict(limit, last_updated=last_updated) for limit in cached["limits"]]
+            result = {**cached, "limits": limits}
+            self._log_cache_hit("get_risk_limits", {"customer_id": customer_id}, result)
+            return result
         
         try:
             with payment_db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT limit_id, limit_type, limit_amount, currency, utilization, utilization_percentage
-                    FROM risk_limits 
-                    WHERE customer_id = ?
-                    ORDER BY limit_type
-                """, (customer_id,))
-                
-                limits = []
-                for row in cursor.fetchall():
-                    limits.append({
-                        "limit_id": row['limit_id'],
-                        "limit_type": row['limit_type'],
-                        "limit_amount": row['limit_amount'],
-                        "currency": row['currency'],
-                        "utilization": row['utilization'],
-                        "utilization_percentage": row['utilization_percentage'],
-                        "available_limit": row['limit_amount'] - row['utilization'],
-                        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "status": "active"
-                    })
+                cursor.execute(_SQL_RISK_LIMITS, (customer_id,))
+                
+                limits = [
+                    dict(zip(_RISK_LIMIT_COLS, row), last_updated=last_updated, status="active")
+                    for row in self._iter_rows(cursor, self.LIMITS_FETCH_ARRAYSIZE)
+                ]
                 
                 result = {
                     "customer_id": customer_id,
@@ -698,7 +821,9 @@ class PaymentAPIService:
                     "total_limits": len(limits)
                 }
                 
-                execution_time = int((time.time() - start_time) * 1000)
+                self._cache_put(self._limits_cache, customer_id, result, time.time() + self.LIMITS_CACHE_TTL_SECONDS)
+                
+                execution_time = elapsed_ms()
                 request_logger.log_request_response(
                     "get_risk_limits",
                     {"customer_id": customer_id},
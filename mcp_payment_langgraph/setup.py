@@ -0,0 +1,22 @@
+"""
+Optional mypyc build of the service layer.
+
+    python setup.py build_ext --inplace
+
+compiles payment_service.py into a C extension next to the source. The
+project itself is run from source with uv; this file only drives the build.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="mcp-payment-langgraph",
+    # The directory is a flat set of scripts, so skip setuptools' package discovery
+    py_modules=[],
+    ext_modules=mypycify([
+        "--ignore-missing-imports",
+        "--follow-imports=silent",
+        "payment_service.py",
+    ]),
+)
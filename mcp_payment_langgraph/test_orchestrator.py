@@ -0,0 +1,112 @@
+"""
+End-to-end tests for the payment orchestrator graph, run against a fake service
+"""
+
+import asyncio
+import unittest
+
+from orchestrator import PaymentOrchestrator
+
+TRANSACTIONS = [
+    {
+        "transaction_id": "TXN_100001",
+        "amount": 250000.0,
+        "currency": "USD",
+        "status": "completed",
+        "transaction_date": "2025-08-01T10:00:00",
+        "recipient_name": "Acme Corp",
+    },
+    {
+        "transaction_id": "TXN_100002",
+        "amount": 180000.0,
+        "currency": "EUR",
+        "status": "failed",
+        "transaction_date": "2025-07-30T09:30:00",
+        "recipient_name": "Globex Ltd",
+    },
+]
+
+MANAGER = {
+    "manager_id": "RM_1001",
+    "name": "Dana Smith",
+    "email": "dana.smith@example.com",
+    "phone": "555-0100",
+    "specialization": "Trade Finance",
+    "experience_years": 12,
+    "department": "London",
+}
+
+
+class FakePaymentService:
+    """Stands in for payment_service with fixed data and records dispute calls"""
+    
+    def __init__(self):
+        self.disputes = []
+    
+    def get_transactions(self, limit=5):
+        return TRANSACTIONS[:limit]
+    
+    def get_relationship_manager_details(self):
+        return MANAGER
+    
+    def raise_dispute(self, transaction_id, reason):
+        self.disputes.append(transaction_id)
+        return {
+            "dispute_id": "DSP_1",
+            "transaction_id": transaction_id,
+            "status": "open",
+            "assigned_manager": {"name": MANAGER["name"], "email": MANAGER["email"]},
+        }
+
+
+class OrchestratorGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.orchestrator = PaymentOrchestrator()
+        self.service = FakePaymentService()
+        self.orchestrator.service = self.service
+    
+    def stream(self, user_input):
+        async def collect():
+            return [section async for section in self.orchestrator.aprocess_request_stream(user_input)]
+        return asyncio.run(collect())
+    
+    def test_transaction_query_returns_final_response(self):
+        result = self.orchestrator.compiled_graph.invoke(
+            self.orchestrator._initial_state("Show my high value transactions")
+        )
+        self.assertIsInstance(result, dict)
+        response = result["final_response"]
+        self.assertTrue(response.startswith("**High Value Transactions (Last 5):**"))
+        self.assertIn("TXN_100001", response)
+        self.assertIn("TXN_100002", response)
+        self.assertEqual(result["action_needed"], ["get_transactions"])
+    
+    def test_dispute_query_runs_transactions_manager_and_dispute(self):
+        response = self.orchestrator.process_request("Raise dispute for my failed transaction")
+        self.assertIn("**High Value Transactions (Last 5):**", response)
+        self.assertIn("**Relationship Manager Details:**", response)
+        self.assertIn("**Dispute Raised Successfully:**", response)
+        self.assertIn("Transaction ID: TXN_100002", response)
+        self.assertEqual(self.service.disputes, ["TXN_100002"])
+    
+    def test_streamed_sections_match_process_request(self):
+        for user_input in (
+            "Show my high value transactions",
+            "Raise dispute for my failed transaction",
+            "Who is my relationship manager?",
+            "hello",
+        ):
+            with self.subTest(user_input=user_input):
+                self.assertEqual(
+                    "\n\n".join(self.stream(user_input)),
+                    self.orchestrator.process_request(user_input),
+                )
+    
+    def test_streaming_graph_is_compiled_on_first_use(self):
+        self.assertIsNone(self.orchestrator._streaming_graph)
+        self.stream("Show my high value transactions")
+        self.assertIsNotNone(self.orchestrator._streaming_graph)
+
+
+if __name__ == "__main__":
+    unittest.main()
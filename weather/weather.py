@@ -1,27 +1,48 @@
-from typing import Any
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Any, AsyncIterator
 import httpx
-from mcp.server.fastmcp import FastMCP
-
-# Initialize FastMCP server
-mcp = FastMCP("weather")
+from mcp.server.fastmcp import Context, FastMCP
 
 # Constants
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
+@dataclass
+class AppContext:
+    """Per-session resources handed to tools through the lifespan context."""
+    client: httpx.AsyncClient
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+    """Open a pooled HTTP client for the session and close it when the session ends.
+
+    Alerts and forecast calls within a session reuse keep-alive connections.
+    HTTP/2 needs the optional h2 package.
+    """
+    async with httpx.AsyncClient(
+        headers={
+            "User-Agent": USER_AGENT,
+            "Accept": "application/geo+json"
+        },
+        timeout=30.0,
+        http2=find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30),
+    ) as client:
+        yield AppContext(client=client)
+
+# Initialize FastMCP server
+mcp = FastMCP("weather", lifespan=app_lifespan)
+
+async def make_nws_request(client: httpx.AsyncClient, url: str) -> dict[str, Any] | None:
     """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json()
+    except Exception:
+        return None
 
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
@@ -35,14 +56,15 @@ Instructions: {props.get('instruction', 'No specific instructions provided')}
 """
 
 @mcp.tool()
-async def get_alerts(state: str) -> str:
+async def get_alerts(state: str, ctx: Context) -> str:
     """Get weather alerts for a US state.
 
     Args:
         state: Two-letter US state code (e.g. CA, NY)
     """
+    client = ctx.request_context.lifespan_context.client
     url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
+    data = await make_nws_request(client, url)
 
     if not data or "features" not in data:
         return "Unable to fetch alerts or no alerts found."
@@ -54,23 +76,24 @@ async def get_alerts(state: str) -> str:
     return "\n---\n".join(alerts)
 
 @mcp.tool()
-async def get_forecast(latitude: float, longitude: float) -> str:
+async def get_forecast(latitude: float, longitude: float, ctx: Context) -> str:
     """Get weather forecast for a location.
 
     Args:
         latitude: Latitude of the location
         longitude: Longitude of the location
     """
+    client = ctx.request_context.lifespan_context.client
     # First get the forecast grid endpoint
     points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    points_data = await make_nws_request(client, points_url)
 
     if not points_data:
         return "Unable to fetch forecast data for this location."
 
     # Get the forecast URL from the points response
     forecast_url = points_data["properties"]["forecast"]
-    forecast_data = await make_nws_request(forecast_url)
+    forecast_data = await make_nws_request(client, forecast_url)
 
     if not forecast_data:
         return "Unable to fetch detailed forecast."
@@ -1,5 +1,6 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+import hashlib
+import json
+import os
 
 # Define nodes and edges as in the LangGraph workflow
 nodes = [
@@ -37,14 +38,37 @@ edges = [
     ("activity_loop", "response_formatter")
 ]
 
-G = nx.DiGraph()
-G.add_nodes_from(nodes)
-G.add_edges_from(edges)
+def main():
+    # Drawing libraries are imported here so importing this module stays cheap;
+    # the Agg backend renders straight to file without probing for a GUI toolkit
+    import networkx as nx
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
 
-plt.figure(figsize=(16, 10))
-pos = nx.spring_layout(G, seed=42)
-nx.draw(G, pos, with_labels=True, node_color='skyblue', node_size=2000, font_size=10, arrowsize=20)
-plt.title("LangGraph Multi-Agent Workflow")
-plt.savefig("langgraph_workflow.png")
-plt.close()
-print("Graph saved as langgraph_workflow.png")
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+
+    plt.figure(figsize=(16, 10))
+    # spring_layout is iterative, so positions are cached per graph signature
+    # as plain JSON (node -> [x, y]) next to this script
+    sig = hashlib.blake2b(repr(sorted(nodes) + sorted(edges)).encode()).hexdigest()[:16]
+    layout_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"layout_{sig}.json")
+    try:
+        with open(layout_path) as f:
+            pos = {node: tuple(xy) for node, xy in json.load(f).items()}
+        if set(pos) != set(nodes):
+            raise ValueError("stale layout")
+    except (OSError, ValueError, TypeError):
+        pos = nx.spring_layout(G, seed=42)
+        with open(layout_path, "w") as f:
+            json.dump({node: [float(x), float(y)] for node, (x, y) in pos.items()}, f)
+    nx.draw(G, pos, with_labels=True, node_color='skyblue', node_size=2000, font_size=10, arrowsize=20)
+    plt.title("LangGraph Multi-Agent Workflow")
+    plt.savefig("langgraph_workflow.png")
+    plt.close()
+    print("Graph saved as langgraph_workflow.png")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 """
 Multi-agent LangGraph example for weather and location tasks.
 """
+import asyncio
+import atexit
 import os
 import openai
 import langgraph as lg
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from mcp.server.fastmcp import FastMCP
 import httpx
 import re
 import logging
-import networkx as nx
+import threading
+import time
+from collections import Counter, OrderedDict
+from enum import IntEnum
+from importlib.util import find_spec
 
 # Set your OpenAI API key
 openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -18,16 +24,38 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("weather_multi_agent")
 
+# Weather is classified once into "good" / "bad" / "unknown" and carried in
+# state as weather_class, so downstream agents don't rescan the text
+def _classify_weather(weather: str) -> str:
+    w = weather.lower()
+    if "sunny" in w or "clear" in w:
+        return "good"
+    if "rain" in w or "showers" in w:
+        return "bad"
+    return "unknown"
+
+def _weather_class(state: Dict[str, Any]) -> str:
+    return state.get("weather_class") or _classify_weather(state.get("weather", ""))
+
+ACTIVITY_SUGGESTIONS = {
+    "good": "Outdoor activities: soccer, tennis, picnic.",
+    "bad": "Indoor activities: board games, reading, movies.",
+    "unknown": "Check local events or try creative indoor hobbies.",
+}
+
 # Define agent behaviors
 # LangGraph does not provide an Agent base class. Use simple Python classes for agents.
 class WeatherAgent:
     """Agent to fetch weather information for a location."""
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return _run_async(self.run_async(state))
+    async def run_async(self, state: Dict[str, Any]) -> Dict[str, Any]:
         location = state.get("location")
         if not location:
-            return {"weather": "No location provided."}
+            return {"weather": "No location provided.", "weather_class": "unknown"}
         # Dummy response, replace with real API call
-        return {"weather": f"Sunny in {location}"}
+        weather = f"Sunny in {location}"
+        return {"weather": weather, "weather_class": _classify_weather(weather)}
 
 class LocationAgent:
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -39,24 +67,23 @@ class LocationAgent:
 
 class PlaygroundAgent:
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        weather = state.get("weather", "")
-        if "Sunny" in weather:
+        if _weather_class(state) == "good":
             return {"playground": "You can book the playground!"}
         return {"playground": "Playground booking not recommended due to weather."}
 
 class ActivityAgent:
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        weather = state.get("weather", "")
-        if "Sunny" in weather:
-            return {"activities": "Outdoor activities: soccer, tennis, picnic."}
-        elif "Rain" in weather:
-            return {"activities": "Indoor activities: board games, reading, movies."}
-        else:
-            return {"activities": "Check local events or try creative indoor hobbies."}
+        return {"activities": ACTIVITY_SUGGESTIONS[_weather_class(state)]}
 
     def __repr__(self):
         return "<ActivityAgent>"
 
+# Location pattern and intent keywords, built once at import
+_LOC_RE = re.compile(r'in ([A-Za-z ,]+)')
+_WORD_RE = re.compile(r'[a-z]+')
+_ACTIVITY_WORDS = frozenset({"activity", "activities", "suggest", "suggestion", "suggestions", "suggested"})
+_BOOKING_WORDS = frozenset({"book", "booking", "booked", "playground", "playgrounds"})
+
 class QueryParserAgent:
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         query = state.get("query", "")
@@ -64,13 +91,15 @@ class QueryParserAgent:
             logger.warning("Query is missing or not a string.")
             return {"location_name": "Sacramento, CA", "intent": "weather", "query": ""}
         # Simple location extraction (improve with NLP if needed)
-        match = re.search(r'in ([A-Za-z ,]+)', query)
+        match = _LOC_RE.search(query)
         location = match.group(1).strip() if match else "Sacramento, CA"
-        intent = "weather"
-        if "activity" in query or "suggest" in query:
+        tokens = set(_WORD_RE.findall(query.lower()))
+        if tokens & _ACTIVITY_WORDS:
             intent = "activity"
-        elif "book" in query or "playground" in query:
+        elif tokens & _BOOKING_WORDS:
             intent = "booking"
+        else:
+            intent = "weather"
         return {"location_name": location, "intent": intent, "query": query}
 
 DEFAULT_LOCATION = "Sacramento, CA"
@@ -83,22 +112,26 @@ class GeocodeAgent:
         # Dummy geocoding for demo
         # In real use, call geocoding API
         if location_name.lower() == DEFAULT_LOCATION.lower():
-            return {"latitude": DEFAULT_LATITUDE, "longitude": DEFAULT_LONGITUDE, **state}
-        return {"latitude": 37.7749, "longitude": -122.4194, **state}  # SF fallback
+            return {"latitude": DEFAULT_LATITUDE, "longitude": DEFAULT_LONGITUDE}
+        return {"latitude": 37.7749, "longitude": -122.4194}  # SF fallback
 
 class AlertAgent:
     """Agent to fetch weather alerts for a location."""
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return _run_async(self.run_async(state))
+    async def run_async(self, state: Dict[str, Any]) -> Dict[str, Any]:
         # Use MCP tool for alerts
-        import asyncio
-        state = state.copy()
         # Use the correct MCP tool name
-        state["alerts"] = asyncio.run(get_lg_alerts("CA"))
-        return state
+        return {"alerts": await get_lg_alerts("CA")}
+
+_RESPONSE_TPL = "Location: {loc}\nWeather: {w}\nActivities: {a}\nPlayground: {p}\nAlerts: {al}"
 
 class ResponseFormatterAgent:
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        response = f"Location: {state.get('location_name')}\nWeather: {state.get('weather')}\nActivities: {state.get('activities')}\nPlayground: {state.get('playground')}\nAlerts: {state.get('alerts')}"
+        get = state.get
+        response = _RESPONSE_TPL.format(
+            loc=get('location_name'), w=get('weather'), a=get('activities'),
+            p=get('playground'), al=get('alerts'))
         return {"response": response}
 
 class RetryAgent:
@@ -116,20 +149,17 @@ class RetryAgent:
 
 class ActivityLoopAgent:
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return _run_async(self.run_async(state))
+    async def run_async(self, state: Dict[str, Any]) -> Dict[str, Any]:
         # Suggest multiple activities for each weather period
-        activities = []
         forecast = state.get("forecast", "")
         # Use the correct MCP tool name for forecast
         if not forecast and "latitude" in state and "longitude" in state:
-            import asyncio
-            forecast = asyncio.run(get_lg_forecast(state["latitude"], state["longitude"]))
-        for line in forecast.split("\n---\n"):
-            if "Sunny" in line or "Clear" in line:
-                activities.append(f"{line}: Outdoor activities: soccer, tennis, picnic.")
-            elif "Rain" in line or "Showers" in line:
-                activities.append(f"{line}: Indoor activities: board games, reading, movies.")
-            else:
-                activities.append(f"{line}: Check local events or try creative indoor hobbies.")
+            forecast = await get_lg_forecast(state["latitude"], state["longitude"])
+        activities = [
+            f"{line}: {ACTIVITY_SUGGESTIONS[_classify_weather(line)]}"
+            for line in forecast.split("\n---\n")
+        ]
         return {"activities": "\n".join(activities)}
 
 class TimeAgent:
@@ -138,39 +168,41 @@ class TimeAgent:
         query = state.get("query", "")
         # Simple demo: extract 'tomorrow', 'today', etc.
         if "tomorrow" in query:
-            state["date"] = "2025-08-06"
+            return {"date": "2025-08-06"}
         elif "today" in query:
-            state["date"] = "2025-08-05"
+            return {"date": "2025-08-05"}
         else:
-            state["date"] = "2025-08-05"  # Default to today
-        return state
+            return {"date": "2025-08-05"}  # Default to today
 
 class PreferenceAgent:
     """Handles user preferences for activities."""
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         query = state.get("query", "")
         if "indoor" in query:
-            state["preference"] = "indoor"
+            return {"preference": "indoor"}
         elif "outdoor" in query:
-            state["preference"] = "outdoor"
+            return {"preference": "outdoor"}
         else:
-            state["preference"] = "any"
-        return state
+            return {"preference": "any"}
 
 class CacheAgent:
-    """Caches recent weather/alert responses."""
-    cache = {}
+    """Caches recent weather/alert responses (least recently used evicted first)."""
+    MAX = 4096
+    def __init__(self):
+        self.cache = OrderedDict()
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         key = f"{state.get('latitude')},{state.get('longitude')},{state.get('date')}"
         if key in self.cache:
-            state["cached_weather"] = self.cache[key]
+            self.cache.move_to_end(key)
             logger.info(f"Cache hit for {key}")
-        else:
-            state["cached_weather"] = None
-            logger.info(f"Cache miss for {key}")
-        return state
+            return {"cached_weather": self.cache[key]}
+        logger.info(f"Cache miss for {key}")
+        return {"cached_weather": None}
     def update_cache(self, key, value):
         self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.MAX:
+            self.cache.popitem(last=False)
 
 class FallbackAgent:
     """Provides a default response if all other agents fail."""
@@ -181,27 +213,22 @@ class NotificationAgent:
     """Sends notifications if weather changes after booking."""
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         # Demo: always notify for rain
-        if "Rain" in state.get("weather", ""):
-            state["notification"] = "Weather changed to rain. Playground booking cancelled."
-        else:
-            state["notification"] = "No weather change notification."
-        return state
+        if _weather_class(state) == "bad":
+            return {"notification": "Weather changed to rain. Playground booking cancelled."}
+        return {"notification": "No weather change notification."}
 
 class AuditAgent:
     """Logs all decisions and data for traceability."""
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info(f"AUDIT: {state}")
-        return state
+        return {}
 
 class PlaygroundBookingAgent:
     """Books playground if weather is good."""
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        weather = state.get("weather", "")
-        if "Sunny" in weather or "Clear" in weather:
-            state["playground_booking"] = "Playground booked!"
-        else:
-            state["playground_booking"] = "Playground not booked due to weather."
-        return state
+        if _weather_class(state) == "good":
+            return {"playground_booking": "Playground booked!"}
+        return {"playground_booking": "Playground not booked due to weather."}
 
 # Create agents
 weather_agent = WeatherAgent()
@@ -225,26 +252,6 @@ retry_weather_agent = RetryAgent(weather_agent, max_retries=3)
 retry_alert_agent = RetryAgent(alert_agent, max_retries=3)
 activity_loop_agent = ActivityLoopAgent()
 
-# Define graph
-graph = nx.DiGraph()
-graph.add_node("query_parser")
-graph.add_node("geocode")
-graph.add_node("weather")
-graph.add_node("alert")
-graph.add_node("playground")
-graph.add_node("activities")
-graph.add_node("response_formatter")
-graph.add_node("retry_weather")
-graph.add_node("retry_alert")
-graph.add_node("activity_loop")
-graph.add_node("time")
-graph.add_node("preference")
-graph.add_node("cache")
-graph.add_node("fallback")
-graph.add_node("notification")
-graph.add_node("audit")
-graph.add_node("playground_booking")
-
 # Create a mapping from node name to agent instance
 agent_map = {
     "query_parser": query_parser_agent,
@@ -266,6 +273,19 @@ agent_map = {
     "playground_booking": playground_booking_agent,
 }
 
+# Pipeline stages as integer indices into AGENTS, so run_multi_agent dispatches
+# by tuple index; the names match the agent_map keys
+class Stage(IntEnum):
+    QUERY_PARSER = 0
+    TIME = 1
+    GEOCODE = 2
+    CACHE = 3
+    WEATHER = 4
+    PLAYGROUND_BOOKING = 5
+    RESPONSE_FORMATTER = 6
+
+AGENTS: Tuple[Any, ...] = tuple(agent_map[stage.name.lower()] for stage in Stage)
+
 # Edges for new agents
 # QueryParserAgent → TimeAgent → GeocodeAgent
 # QueryParserAgent → PreferenceAgent → ActivityAgent
@@ -273,54 +293,102 @@ agent_map = {
 # WeatherAgent → NotificationAgent
 # All agents → AuditAgent
 # FallbackAgent → ResponseFormatterAgent
-
-graph.add_edge("query_parser", "time")
-graph.add_edge("time", "geocode")
-graph.add_edge("query_parser", "preference")
-graph.add_edge("preference", "activities")
-graph.add_edge("geocode", "cache")
-graph.add_edge("cache", "weather")
-graph.add_edge("weather", "notification")
-graph.add_edge("weather", "playground_booking")
-graph.add_edge("playground_booking", "response_formatter")
-
-# Audit edges (log after each major step)
-graph.add_edge("geocode", "audit")
-graph.add_edge("weather", "audit")
-graph.add_edge("alert", "audit")
-graph.add_edge("activities", "audit")
-graph.add_edge("playground", "audit")
-graph.add_edge("response_formatter", "audit")
-
-# Fallback edge
-# If response_formatter fails, fallback
-# (Demo: not implemented as error handling, but node is available)
-graph.add_edge("fallback", "response_formatter")
+# (generate_graph.py holds the full edge list and draws the workflow)
 
 mcp = FastMCP("weather_multi_agent")
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
 
+NWS_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/geo+json"
+}
+
+# One long-lived event loop and HTTP client for the synchronous agents, so
+# keep-alive connections are reused instead of rebuilt by asyncio.run() per call.
+# The loop runs on its own daemon thread, so the sync entry points also work
+# when called from inside another running loop (e.g. an MCP tool).
+_LOOP = asyncio.new_event_loop()
+_LOOP_THREAD = threading.Thread(target=_LOOP.run_forever, name="agent-event-loop", daemon=True)
+_LOOP_THREAD.start()
+_CLIENT = None
+
+def _run_async(coro):
+    """Run a coroutine on the shared loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+def _get_client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None:
+        # HTTP/2 needs the optional h2 package
+        _CLIENT = httpx.AsyncClient(
+            headers=NWS_HEADERS, timeout=30.0, http2=find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30))
+    return _CLIENT
+
+def _close_loop():
+    if _CLIENT is not None:
+        _run_async(_CLIENT.aclose())
+    _LOOP.call_soon_threadsafe(_LOOP.stop)
+    _LOOP_THREAD.join(5.0)
+    if not _LOOP.is_running():
+        _LOOP.close()
+
+atexit.register(_close_loop)
+
+# Successful NWS responses keyed by URL -> (data, expires_at); /points/ lookups
+# map coordinates to grid offices and change far less often than alerts
+NWS_CACHE_MAXSIZE = 512
+NWS_CACHE_TTL_SECONDS = 60.0
+NWS_POINTS_CACHE_TTL_SECONDS = 600.0
+_NWS_CACHE: Dict[str, Any] = {}
+
+def _nws_cache_get(url: str):
+    entry = _NWS_CACHE.get(url)
+    if entry is None:
+        return None
+    if entry[1] <= time.monotonic():
+        _NWS_CACHE.pop(url, None)
+        return None
+    return entry[0]
+
+def _nws_cache_put(url: str, data: dict):
+    ttl = NWS_POINTS_CACHE_TTL_SECONDS if "/points/" in url else NWS_CACHE_TTL_SECONDS
+    if url not in _NWS_CACHE and len(_NWS_CACHE) >= NWS_CACHE_MAXSIZE:
+        _NWS_CACHE.pop(next(iter(_NWS_CACHE)), None)
+    _NWS_CACHE[url] = (data, time.monotonic() + ttl)
+
+async def _fetch_json(client: httpx.AsyncClient, url: str) -> dict:
+    response = await client.get(url, headers=NWS_HEADERS, timeout=30.0)
+    response.raise_for_status()
+    return response.json()
+
 # Best Practice: Centralized error handling for async requests
-async def make_nws_request(url: str) -> dict:
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as e:
-            logger.error(f"Request error: {e}")
-            return None
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP status error: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            return None
+async def make_nws_request(url: str, client: httpx.AsyncClient = None) -> dict:
+    cached = _nws_cache_get(url)
+    if cached is not None:
+        return cached
+    try:
+        if client is not None:
+            data = await _fetch_json(client, url)
+        # The shared client is bound to _LOOP; callers on another loop (the MCP
+        # server's) get a short-lived client instead
+        elif asyncio.get_running_loop() is _LOOP:
+            data = await _fetch_json(_get_client(), url)
+        else:
+            async with httpx.AsyncClient() as own_client:
+                data = await _fetch_json(own_client, url)
+        _nws_cache_put(url, data)
+        return data
+    except httpx.RequestError as e:
+        logger.error(f"Request error: {e}")
+        return None
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP status error: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        return None
 
 @mcp.tool()
 async def get_lg_alerts(state: str) -> str:
@@ -364,9 +432,10 @@ async def suggest_activities(state: str = None, latitude: float = None, longitud
     else:
         return "Please provide a location (state or lat/lon)."
     # Simple logic for demo
-    if "Sunny" in forecast or "Clear" in forecast:
+    weather_class = _classify_weather(forecast)
+    if weather_class == "good":
         return "Book the playground! Suggested activities: soccer, tennis, picnic."
-    elif "Rain" in forecast or "Showers" in forecast:
+    elif weather_class == "bad":
         return "Do not book playground. Suggested activities: board games, reading, movies."
     else:
         return f"Weather info: {forecast}\nSuggested activities: Check local events or try creative indoor hobbies."
@@ -378,50 +447,71 @@ async def health_check() -> str:
     return "Weather multi-agent MCP server is healthy."
 
 def run_multi_agent(query: str):
+    return _run_async(arun_multi_agent(query))
+
+# Formatted responses for weather queries that named no location (so ran for
+# the default), keyed by date -> (response, expires_at)
+_default_responses: Dict[str, Any] = {}
+# How often run_multi_agent answered without running the full pipeline
+FAST_PATH_COUNTS = Counter()
+
+def _is_fetch_failure(value: Any) -> bool:
+    # The NWS tools report failed requests as "Unable to fetch ..." text
+    return isinstance(value, str) and value.startswith("Unable to fetch")
+
+async def arun_multi_agent(query: str):
+    if not isinstance(query, str) or not query.strip():
+        FAST_PATH_COUNTS["empty_query"] += 1
+        return "Please provide a query."
+    # Agents return only the keys they set; the audit log records those deltas
+    # rather than a copy of the whole state after every stage
     state = {"query": query}
     audit_log = []
+    def step(stage: Stage, delta: Dict[str, Any], detail: str = None):
+        state.update(delta)
+        label = stage.name.lower()
+        audit_log.append((f"{label} ({detail})" if detail else label, delta))
     # 1. Parse query
-    state = agent_map["query_parser"].run(state)
-    audit_log.append(("query_parser", dict(state)))
+    step(Stage.QUERY_PARSER, AGENTS[Stage.QUERY_PARSER].run(state))
     # 2. Extract time
-    state = agent_map["time"].run(state)
-    audit_log.append(("time", dict(state)))
+    step(Stage.TIME, AGENTS[Stage.TIME].run(state))
+    # Weather queries without a location all resolve to the default one, so a
+    # recent answer for the same date is reused
+    default_key = None
+    if state["intent"] == "weather" and not _LOC_RE.search(query):
+        default_key = state["date"]
+        entry = _default_responses.get(default_key)
+        if entry is not None and entry[1] > time.monotonic():
+            FAST_PATH_COUNTS["default_location_cached"] += 1
+            return entry[0]
     # 3. Geocode location
-    state = agent_map["geocode"].run(state)
-    audit_log.append(("geocode", dict(state)))
+    step(Stage.GEOCODE, AGENTS[Stage.GEOCODE].run(state))
     # 4. Check cache (optional)
-    state = agent_map["cache"].run(state)
-    audit_log.append(("cache", dict(state)))
+    step(Stage.CACHE, AGENTS[Stage.CACHE].run(state))
     # Branch: If cache hit, skip weather API and use cached value
     if state.get("cached_weather"):
-        state["weather"] = state["cached_weather"]
-        audit_log.append(("weather (cache hit)", dict(state)))
+        cached = state["cached_weather"]
+        step(Stage.WEATHER, {"weather": cached, "weather_class": _classify_weather(cached)}, "cache hit")
     else:
         # 5. Get weather
-        state = agent_map["weather"].run(state)
-        # Update cache
-        key = f"{state.get('latitude')},{state.get('longitude')},{state.get('date')}"
-        agent_map["cache"].update_cache(key, state["weather"])
-        audit_log.append(("weather (API)", dict(state)))
-    # Branch: If weather is good, book playground and suggest outdoor activities
-    weather = state.get("weather", "")
-    if "Sunny" in weather or "Clear" in weather:
-        state = agent_map["playground_booking"].run(state)
-        state["activities"] = "Outdoor activities: soccer, tennis, picnic."
-        audit_log.append(("playground_booking (good)", dict(state)))
-    # Branch: If weather is bad, do not book playground and suggest indoor activities
-    elif "Rain" in weather or "Showers" in weather:
-        state = agent_map["playground_booking"].run(state)
-        state["activities"] = "Indoor activities: board games, reading, movies."
-        audit_log.append(("playground_booking (bad)", dict(state)))
-    # Branch: Otherwise, fallback to generic activities
-    else:
-        state = agent_map["playground_booking"].run(state)
-        state["activities"] = "Check local events or try creative indoor hobbies."
-        audit_log.append(("playground_booking (other)", dict(state)))
+        delta = await AGENTS[Stage.WEATHER].run_async(state)
+        # Update cache (a failed fetch is retried next time, not cached)
+        if not _is_fetch_failure(delta["weather"]):
+            key = f"{state.get('latitude')},{state.get('longitude')},{state.get('date')}"
+            AGENTS[Stage.CACHE].update_cache(key, delta["weather"])
+        step(Stage.WEATHER, delta, "API")
+    # Branch on the weather class: book the playground when good, and suggest
+    # outdoor, indoor or generic activities for good, bad or unknown weather
+    weather_class = _weather_class(state)
+    delta = AGENTS[Stage.PLAYGROUND_BOOKING].run(state)
+    delta["activities"] = ACTIVITY_SUGGESTIONS[weather_class]
+    step(Stage.PLAYGROUND_BOOKING, delta, "other" if weather_class == "unknown" else weather_class)
     # 8. Format response
-    state = agent_map["response_formatter"].run(state)
-    audit_log.append(("response_formatter", dict(state)))
+    step(Stage.RESPONSE_FORMATTER, AGENTS[Stage.RESPONSE_FORMATTER].run(state))
+    # Only a run whose weather fetch succeeded is reused; a transient failure
+    # must not be replayed to later default-location queries
+    if default_key is not None and not _is_fetch_failure(state.get("weather")):
+        _default_responses[default_key] = (state["response"], time.monotonic() + NWS_CACHE_TTL_SECONDS)
     # Add audit log to state for inspection
     state["audit_log"] = audit_log
     return state.get("response", state)
@@ -431,5 +521,4 @@ if __name__ == "__main__":
     query = "What's the weather in Sacramento?"
     result = run_multi_agent(query)
     logger.info(result)
-    import asyncio
     mcp.run(transport='stdio')
@@ -0,0 +1,57 @@
+"""
+Tests for query parsing and the default-location response cache in run_multi_agent.
+"""
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import langgraph_multi_agent as m
+
+QUERY = "What's the weather today?"
+
+
+class QueryParserIntentTest(unittest.TestCase):
+    def intent(self, query):
+        return m.QueryParserAgent().run({"query": query})["intent"]
+
+    def test_inflected_keywords_select_their_intent(self):
+        self.assertEqual(self.intent("Any activities in Boston?"), "activity")
+        self.assertEqual(self.intent("Suggestions for Sacramento"), "activity")
+        self.assertEqual(self.intent("Booking the playground tomorrow"), "booking")
+        self.assertEqual(self.intent("Are playgrounds open in Reno?"), "booking")
+
+    def test_keywords_match_whole_words_case_insensitively(self):
+        self.assertEqual(self.intent("Suggest something to do"), "activity")
+        self.assertEqual(self.intent("Can I book the playground?"), "booking")
+        self.assertEqual(self.intent("Weather for my notebook trip"), "weather")
+
+    def test_activity_wins_over_booking(self):
+        self.assertEqual(self.intent("Suggest an activity and book the playground"), "activity")
+
+
+class DefaultResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        m._default_responses.clear()
+        m.cache_agent.cache.clear()
+
+    def test_failed_weather_fetch_is_not_reused(self):
+        failed = AsyncMock(return_value={"weather": "Unable to fetch detailed forecast.", "weather_class": "unknown"})
+        ok = AsyncMock(return_value={"weather": "Sunny and clear", "weather_class": "good"})
+        with patch.object(m.weather_agent, "run_async", failed):
+            first = m.run_multi_agent(QUERY)
+        with patch.object(m.weather_agent, "run_async", ok):
+            second = m.run_multi_agent(QUERY)
+        self.assertIn("Unable to fetch detailed forecast.", first)
+        self.assertIn("Sunny and clear", second)
+        ok.assert_awaited_once()
+
+    def test_successful_response_is_reused(self):
+        ok = AsyncMock(return_value={"weather": "Sunny and clear", "weather_class": "good"})
+        with patch.object(m.weather_agent, "run_async", ok):
+            first = m.run_multi_agent(QUERY)
+            second = m.run_multi_agent(QUERY)
+        self.assertEqual(first, second)
+        ok.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()